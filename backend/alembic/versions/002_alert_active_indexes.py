@@ -0,0 +1,36 @@
+"""Add composite indexes for active-alert lookups
+
+Revision ID: 002_alert_active_indexes
+Revises: 001_initial_schema
+Create Date: 2026-08-29
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002_alert_active_indexes'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Active-alert counts filter on resolved_at IS NULL (optionally plus
+    # severity or device_id); these composites let those queries resolve
+    # from the index alone. MySQL has no partial indexes, so the composite
+    # form replaces the WHERE-qualified indexes used on Postgres.
+    op.create_index(
+        'ix_alerts_factory_resolved_severity',
+        'alerts',
+        ['factory_id', 'resolved_at', 'severity'],
+    )
+    op.create_index(
+        'ix_alerts_factory_device_resolved',
+        'alerts',
+        ['factory_id', 'device_id', 'resolved_at'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_alerts_factory_device_resolved', table_name='alerts')
+    op.drop_index('ix_alerts_factory_resolved_severity', table_name='alerts')
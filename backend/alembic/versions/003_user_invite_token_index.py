@@ -0,0 +1,29 @@
+"""Add unique index on users.invite_token
+
+Revision ID: 003_user_invite_token_index
+Revises: 002_alert_active_indexes
+Create Date: 2026-08-29
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_user_invite_token_index'
+down_revision = '002_alert_active_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Invite acceptance looks users up by token; a unique index turns that
+    # into a point read and enforces token uniqueness at the same time.
+    op.create_index(
+        'ix_users_invite_token',
+        'users',
+        ['invite_token'],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_invite_token', table_name='users')
@@ -1,8 +1,9 @@
 """Alerts API router."""
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_user, get_db
@@ -14,6 +15,10 @@ from app.core.logging import get_logger
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 logger = get_logger(__name__)
 
+# One vectorized validation pass for the whole page instead of per-row
+# AlertResponse construction.
+_ALERT_LIST_ADAPTER = TypeAdapter(List[AlertResponse])
+
 
 async def _build_alert_response(db: AsyncSession, alert) -> AlertResponse:
     """Build AlertResponse with rule and device names."""
@@ -48,21 +53,39 @@ async def list_alerts(
     end: Optional[datetime] = Query(None, description="End datetime (ISO8601)"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    before: Optional[datetime] = Query(None, description="Keyset cursor: only alerts triggered before this timestamp"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List alerts for the factory."""
     factory_id = getattr(current_user, '_token_factory_id', None)
-    
+
     alerts, total = await alert_repo.get_all(
-        db, factory_id, device_id, severity, resolved, start, end, page, per_page
+        db, factory_id, device_id, severity, resolved, start, end, page, per_page, before
     )
     
-    # Build responses with rule/device names
-    data = []
+    # Build responses with rule/device names (bulk-fetched, not per-alert)
+    rules = await rule_repo.get_many_by_ids(db, factory_id, [a.rule_id for a in alerts])
+    devices = await device_repo.get_many_by_ids(db, factory_id, [a.device_id for a in alerts])
+
+    rows = []
     for alert in alerts:
-        data.append(await _build_alert_response(db, alert))
-    
+        rule = rules.get(alert.rule_id)
+        device = devices.get(alert.device_id)
+        rows.append({
+            "id": alert.id,
+            "rule_id": alert.rule_id,
+            "rule_name": rule.name if rule else None,
+            "device_id": alert.device_id,
+            "device_name": device.name if device else None,
+            "triggered_at": alert.triggered_at,
+            "resolved_at": alert.resolved_at,
+            "severity": alert.severity,
+            "message": alert.message,
+            "telemetry_snapshot": alert.telemetry_snapshot,
+        })
+
+    data = _ALERT_LIST_ADAPTER.validate_python(rows)
     return AlertListResponse(data=data, total=total, page=page, per_page=per_page)
 
 
@@ -1,10 +1,13 @@
 """Authentication router."""
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
+from app.core.database import AsyncSessionLocal
 from app.core.dependencies import get_db
 from app.core.security import (
     create_access_token,
@@ -51,8 +54,26 @@ async def list_factories(db: AsyncSession = Depends(get_db)):
     return [FactoryResponse(id=f.id, name=f.name, slug=f.slug) for f in factories]
 
 
+async def _record_last_login(user_id: int) -> None:
+    """Stamp last_login after the response is sent.
+
+    Runs as a background task with its own session — the request-scoped
+    session is already closed by the time background tasks execute.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            await user_repo.update_last_login(session, user_id)
+            await session.commit()
+    except Exception as e:
+        logger.warning("auth.last_login_update_failed", user_id=user_id, error=str(e))
+
+
 @router.post("/auth/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+async def login(
+    request: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
     """Authenticate user and return JWT token."""
     # Verify factory exists
     factory = await factory_repo.get_by_id(db, request.factory_id)
@@ -80,8 +101,9 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
             detail="Invalid credentials",
         )
     
-    # Verify password
-    if not verify_password(request.password, user.hashed_password):
+    # Verify password on a thread: bcrypt takes ~200ms by design, which
+    # would otherwise stall every in-flight request on the event loop.
+    if not await asyncio.to_thread(verify_password, request.password, user.hashed_password):
         logger.warning(
             "Login failed - invalid password",
             factory_id=request.factory_id,
@@ -101,6 +123,9 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
         role=user.role.value,
     )
     
+    # Off the critical path: the token response doesn't depend on it.
+    background_tasks.add_task(_record_last_login, user.id)
+
     logger.info(
         "User logged in successfully",
         factory_id=factory.id,
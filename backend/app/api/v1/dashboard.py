@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import gather_with_sessions
 from app.core.dependencies import get_current_user, get_db
 from app.models.user import User
 from app.repositories import device_repo, alert_repo
@@ -18,22 +19,21 @@ async def get_dashboard_summary(
 ):
     """Get factory-level operational summary."""
     factory_id = getattr(current_user, '_token_factory_id', None)
-    
-    # Get device counts
-    devices, total_devices = await device_repo.get_all(db, factory_id, per_page=1000)
-    active_devices = sum(1 for d in devices if d.is_active)
-    
-    # Calculate online devices (last_seen within 10 minutes)
-    from datetime import datetime, timedelta
-    threshold = datetime.utcnow() - timedelta(minutes=10)
-    online_devices = sum(
-        1 for d in devices 
-        if d.is_active and d.last_seen and d.last_seen > threshold
+
+    # Fetch the device page and alert counts concurrently; they are
+    # independent queries, so overlapping them hides one round trip.
+    (devices, total_devices), severity_counts = await gather_with_sessions(
+        lambda s: device_repo.get_all(s, factory_id, per_page=1000),
+        lambda s: alert_repo.get_active_severity_counts(s, factory_id),
     )
+    active_devices = sum(1 for d in devices if d.is_active)
+
+    # is_online is computed inside the device SELECT (10-minute threshold)
+    online_devices = sum(1 for d in devices if d.is_active and d.is_online)
     
-    # Get alert counts
-    active_alerts = await alert_repo.get_active_count_by_factory(db, factory_id)
-    critical_alerts = await alert_repo.get_critical_count_by_factory(db, factory_id)
+    # Alert counts (one grouped query instead of per-severity COUNTs)
+    active_alerts = sum(severity_counts.values())
+    critical_alerts = severity_counts.get("critical", 0)
     
     # Calculate health score (average of device health scores)
     # Simple calculation: (online_devices / total_active) * 100 - penalties for alerts
@@ -19,7 +19,10 @@ router = APIRouter(prefix="/devices", tags=["devices"])
 logger = get_logger(__name__)
 
 
-@router.get("", response_model=DeviceListResponse)
+# response_model=None: rows are already DeviceListItem-shaped dicts, so we
+# skip the pydantic re-validation pass and let orjson serialize directly.
+# DeviceListResponse stays in `responses` for the OpenAPI schema.
+@router.get("", response_model=None, responses={200: {"model": DeviceListResponse}})
 async def list_devices(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -35,12 +38,12 @@ async def list_devices(
         db, factory_id, page, per_page, search, is_active
     )
     
-    return DeviceListResponse(
-        data=devices,
-        total=total,
-        page=page,
-        per_page=per_page,
-    )
+    return {
+        "data": devices,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+    }
 
 
 @router.get("/{device_id}", response_model=DeviceResponse)
@@ -75,8 +75,12 @@ async def create_report(
         analytics_job_id=data.analytics_job_id,
     )
     
-    # Dispatch Celery task
-    generate_report_task.delay(report_id)
+    # Dispatch Celery task, routed per format so a long Excel build
+    # can't head-of-line-block quick PDF/JSON jobs.
+    generate_report_task.apply_async(
+        args=[report_id],
+        queue=f"reports.{report_format.value}",
+    )
     
     logger.info(
         "report.dispatched",
@@ -8,6 +8,7 @@ from app.core.dependencies import get_current_user, get_db
 from app.models.user import User
 from app.schemas.rule import RuleCreate, RuleUpdate, RuleResponse, RuleListResponse
 from app.repositories import rule_repo, device_repo
+from app.services import rule_cache
 from app.core.logging import get_logger
 
 router = APIRouter(prefix="/rules", tags=["rules"])
@@ -81,7 +82,8 @@ async def create_rule(
     
     rule = await rule_repo.create(db, factory_id, current_user.id, data.model_dump())
     device_ids = await rule_repo.get_device_ids_for_rule(db, rule.id)
-    
+    await rule_cache.invalidate(factory_id)
+
     logger.info(
         "rule.api_created",
         factory_id=factory_id,
@@ -128,8 +130,9 @@ async def update_rule(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rule not found",
         )
-    
+
     device_ids = await rule_repo.get_device_ids_for_rule(db, rule.id)
+    await rule_cache.invalidate(factory_id)
     return _build_rule_response(rule, device_ids)
 
 
@@ -148,7 +151,8 @@ async def delete_rule(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rule not found",
         )
-    
+
+    await rule_cache.invalidate(factory_id)
     return {"message": "Rule deleted successfully"}
 
 
@@ -167,6 +171,7 @@ async def toggle_rule(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rule not found",
         )
-    
+
     device_ids = await rule_repo.get_device_ids_for_rule(db, rule.id)
+    await rule_cache.invalidate(factory_id)
     return _build_rule_response(rule, device_ids)
@@ -1,7 +1,7 @@
 """FastAPI dependencies for auth and database."""
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -22,16 +22,24 @@ async def get_db():
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """Extract and validate current user from JWT token."""
     payload = decode_access_token(token)
-    
+
     user_id = int(payload.get("sub"))
     factory_id = payload.get("factory_id")
-    
-    user = await user_repo.get_by_id(db, user_id)
+
+    # Request-scoped cache: repeat resolutions of the same user within one
+    # request skip the SELECT entirely.
+    cache = getattr(request.state, "user_cache", None)
+    if cache is None:
+        cache = {}
+        request.state.user_cache = cache
+
+    user = await user_repo.get_by_id(db, factory_id, user_id, cache=cache)
     
     if not user:
         raise HTTPException(
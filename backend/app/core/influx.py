@@ -33,16 +33,35 @@ class InfluxDBClient:
             logger.error("InfluxDB write failed", error=str(e))
             raise
     
-    async def query(self, flux: str) -> List[Any]:
-        """Execute Flux query."""
+    async def query(self, flux: str, params: dict = None) -> List[Any]:
+        """Execute Flux query.
+
+        ``params`` values are bound as Flux variables by the client, so the
+        query text stays identical across calls (and values are never
+        interpolated into the script).
+        """
         try:
             query_api = self.client.query_api()
-            result = await query_api.query(query=flux)
+            result = await query_api.query(query=flux, params=params)
             return result
         except Exception as e:
             logger.error("InfluxDB query failed", error=str(e))
             raise
     
+    async def query_dataframe(self, flux: str, params: dict = None):
+        """Execute Flux query, returning pandas DataFrame(s).
+
+        The client parses the annotated-CSV response straight into a frame
+        without materializing per-record FluxRecord objects — use this for
+        bulk pulls. May return a list of frames for multi-table results.
+        """
+        try:
+            query_api = self.client.query_api()
+            return await query_api.query_data_frame(query=flux, params=params)
+        except Exception as e:
+            logger.error("InfluxDB dataframe query failed", error=str(e))
+            raise
+
     async def close(self) -> None:
         """Close client connection."""
         await self.client.close()
@@ -53,13 +72,26 @@ _influx_client: InfluxDBClient = None
 
 
 def get_influx_client() -> InfluxDBClient:
-    """Get or create InfluxDB client instance."""
+    """Get or create the shared InfluxDB client.
+
+    The client holds a persistent HTTP connection pool; callers must not
+    close it. It lives for the process lifetime and is shut down via
+    close_influx_client() in the app lifespan.
+    """
     global _influx_client
     if _influx_client is None:
         _influx_client = InfluxDBClient()
     return _influx_client
 
 
+async def close_influx_client() -> None:
+    """Close the shared InfluxDB client (call on shutdown)."""
+    global _influx_client
+    if _influx_client is not None:
+        await _influx_client.close()
+        _influx_client = None
+
+
 async def check_influx_health() -> bool:
     """Check if InfluxDB is reachable."""
     try:
@@ -1,7 +1,16 @@
 """MinIO S3 client for object storage."""
-import json
+import functools
+import hashlib
+import hmac
+import io
+from datetime import datetime
 from typing import Optional
+from urllib.parse import quote
+
 import boto3
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
@@ -10,6 +19,22 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+_REGION = "us-east-1"  # MinIO doesn't use regions, but SigV4 requires one
+
+
+@functools.lru_cache(maxsize=4)
+def _signing_key(secret_key: str, datestamp: str) -> bytes:
+    """Derive the SigV4 signing key for a credential date.
+
+    The key only changes once per UTC day, so it is cached and the four
+    chained HMACs are paid once per worker process per day instead of on
+    every presign call.
+    """
+    k_date = hmac.new(f"AWS4{secret_key}".encode(), datestamp.encode(), hashlib.sha256).digest()
+    k_region = hmac.new(k_date, _REGION.encode(), hashlib.sha256).digest()
+    k_service = hmac.new(k_region, b"s3", hashlib.sha256).digest()
+    return hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
+
 
 class MinIOClient:
     """MinIO S3 client wrapper."""
@@ -70,7 +95,7 @@ class MinIOClient:
             self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
-                Body=json.dumps(data, indent=2, default=str),
+                Body=orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str),
                 ContentType="application/json",
             )
             logger.info(
@@ -90,31 +115,105 @@ class MinIOClient:
             )
             raise
     
-    def generate_presigned_url(self, key: str, expiry: int = 3600) -> str:
-        """Generate presigned URL for object access.
-        
+    def upload_parquet(self, factory_id: int, job_id: str, df) -> str:
+        """Upload a DataFrame to MinIO as zstd-compressed Parquet.
+
+        Used for the bulky numeric parts of analytics results (e.g. forecast
+        rows), which are 5-10x smaller in Parquet than in JSON. Consumers
+        read the object back with ``pd.read_parquet``.
+
         Args:
-            key: Object key
-            expiry: URL expiration time in seconds (default: 1 hour)
-            
+            factory_id: Factory ID for key prefix
+            job_id: Job ID for filename
+            df: pandas DataFrame to serialize
+
         Returns:
-            Presigned URL string
+            Presigned URL for downloading the object
         """
+        key = f"{factory_id}/analytics/{job_id}.parquet"
+
+        buf = io.BytesIO()
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            buf,
+            compression="zstd",
+        )
+
         try:
-            url = self.s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.bucket, "Key": key},
-                ExpiresIn=expiry,
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=buf.getvalue(),
+                ContentType="application/octet-stream",
             )
-            return url
+            logger.info(
+                "minio.upload_success",
+                bucket=self.bucket,
+                key=key,
+                factory_id=factory_id,
+                job_id=job_id,
+            )
+            return self.generate_presigned_url(key)
         except ClientError as e:
             logger.error(
-                "minio.presign_failed",
+                "minio.upload_failed",
                 bucket=self.bucket,
                 key=key,
                 error=str(e),
             )
             raise
+
+    def generate_presigned_url(self, key: str, expiry: int = 3600) -> str:
+        """Generate presigned URL for object access.
+
+        Signs the URL directly (AWS SigV4 over HMAC-SHA256) instead of
+        going through boto3's presigner, with the per-day signing key
+        cached — see :func:`_signing_key`. Purely local computation; no
+        round trip to MinIO.
+
+        Args:
+            key: Object key
+            expiry: URL expiration time in seconds (default: 1 hour)
+
+        Returns:
+            Presigned URL string
+        """
+        now = datetime.utcnow()
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = now.strftime("%Y%m%d")
+        scope = f"{datestamp}/{_REGION}/s3/aws4_request"
+
+        host = settings.minio_endpoint
+        canonical_uri = quote(f"/{self.bucket}/{key}")
+        credential = quote(f"{settings.minio_access_key}/{scope}", safe="")
+
+        # Query parameters in canonical (sorted) order
+        canonical_query = (
+            "X-Amz-Algorithm=AWS4-HMAC-SHA256"
+            f"&X-Amz-Credential={credential}"
+            f"&X-Amz-Date={amz_date}"
+            f"&X-Amz-Expires={expiry}"
+            "&X-Amz-SignedHeaders=host"
+        )
+
+        canonical_request = (
+            f"GET\n{canonical_uri}\n{canonical_query}\n"
+            f"host:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+        )
+        string_to_sign = (
+            f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n"
+            f"{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+        )
+        signature = hmac.new(
+            _signing_key(settings.minio_secret_key, datestamp),
+            string_to_sign.encode(),
+            hashlib.sha256,
+        ).hexdigest()
+
+        return (
+            f"http://{host}{canonical_uri}?{canonical_query}"
+            f"&X-Amz-Signature={signature}"
+        )
     
     def delete_object(self, key: str) -> None:
         """Delete object from bucket.
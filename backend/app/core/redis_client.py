@@ -1,4 +1,6 @@
 """Redis client configuration."""
+from typing import Optional
+
 from redis.asyncio import Redis
 
 from app.core.config import settings
@@ -6,6 +8,9 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Singleton instance (per process); connections are pooled inside it.
+_redis: Optional[Redis] = None
+
 
 async def get_redis() -> Redis:
     """Get Redis client instance."""
@@ -16,6 +21,22 @@ async def get_redis() -> Redis:
     return redis
 
 
+def get_redis_client() -> Redis:
+    """Get or create the shared Redis client for this process.
+
+    Unlike :func:`get_redis`, this reuses one client (and its connection
+    pool) across calls, so hot paths don't pay a TCP handshake per
+    operation.
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+        )
+    return _redis
+
+
 async def check_redis_health() -> bool:
     """Check if Redis is reachable."""
     try:
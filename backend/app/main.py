@@ -3,7 +3,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 import structlog
 
@@ -12,7 +12,7 @@ from app.core.logging import get_logger
 from app.core.middleware import RequestIDMiddleware
 from app.core.database import check_db_health
 from app.core.redis_client import check_redis_health
-from app.core.influx import check_influx_health
+from app.core.influx import check_influx_health, close_influx_client
 from app.core.minio_client import get_minio_client
 from app.api.v1 import auth, devices, telemetry, dashboard, rules, alerts, analytics, reports, users
 from app.api.v1.metrics import router as metrics_router
@@ -57,6 +57,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("API shutting down")
+    await close_influx_client()
 
 
 def create_app() -> FastAPI:
@@ -68,6 +69,9 @@ def create_app() -> FastAPI:
         redoc_url="/api/redoc",
         openapi_url="/api/openapi.json",
         lifespan=lifespan,
+        # orjson serializes datetimes natively in C, which matters for the
+        # large KPI-history and telemetry payloads.
+        default_response_class=ORJSONResponse,
     )
     
     # Middleware (order matters)
@@ -36,6 +36,8 @@ class Alert(Base):
     __table_args__ = (
         Index("idx_factory_device_time", "factory_id", "device_id", "triggered_at"),
         Index("idx_factory_time", "factory_id", "triggered_at"),
+        Index("idx_factory_resolved_severity", "factory_id", "resolved_at", "severity"),
+        Index("idx_factory_device_resolved", "factory_id", "device_id", "resolved_at"),
     )
 
 
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 
 from sqlalchemy import ForeignKey, Index, String, Boolean
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 from app.models.base import Base
 
@@ -27,6 +27,10 @@ class Device(Base):
         default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Computed in SQL by device_repo.get_all (with_expression); None when the
+    # query did not populate it.
+    is_online: Mapped[Optional[bool]] = query_expression()
+
     # Relationships
     factory: Mapped["Factory"] = relationship("Factory", back_populates="devices")
     parameters: Mapped[list["DeviceParameter"]] = relationship(
@@ -12,6 +12,7 @@ class ReportFormat(str, enum.Enum):
     PDF = "pdf"
     EXCEL = "excel"
     JSON = "json"
+    PARQUET = "parquet"
 
 
 class ReportStatus(str, enum.Enum):
@@ -28,7 +28,7 @@ class User(Base):
     )
     permissions: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
     is_active: Mapped[bool] = mapped_column(default=True)
-    invite_token: Mapped[Optional[str]] = mapped_column(String(255))
+    invite_token: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)
     invited_at: Mapped[Optional[datetime]] = mapped_column()
     last_login: Mapped[Optional[datetime]] = mapped_column()
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
@@ -41,7 +41,10 @@ class User(Base):
     )
     reports: Mapped[list["Report"]] = relationship("Report", back_populates="creator")
 
-    # Unique constraint on factory_id + email
+    # Unique constraint on factory_id + email; also the access path for the
+    # login-time get_by_email lookup (InnoDB secondary indexes carry the PK,
+    # so the row fetch is one clustered-index hop — no separate covering
+    # index needed). get_by_id goes straight through the PK.
     __table_args__ = (
         Index("uq_factory_email", "factory_id", "email", unique=True),
     )
@@ -3,6 +3,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 
 from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.alert import Alert, RuleCooldown
@@ -29,8 +30,8 @@ async def create_alert(
         telemetry_snapshot=telemetry_snapshot,
     )
     db.add(alert)
+    await db.flush()  # Populate alert.id without the extra refresh SELECT
     await db.commit()
-    await db.refresh(alert)
     return alert
 
 
@@ -44,8 +45,20 @@ async def get_all(
     end: Optional[datetime] = None,
     page: int = 1,
     per_page: int = 20,
+    before: Optional[datetime] = None,
+    include_total: bool = True,
 ) -> Tuple[List[Alert], int]:
-    """Get all alerts for a factory with filtering and pagination."""
+    """Get all alerts for a factory with filtering and pagination.
+
+    When ``before`` is provided, keyset pagination is used instead of
+    OFFSET: only alerts triggered strictly before that timestamp are
+    returned. Deep pages then cost O(per_page) via the
+    (factory_id, triggered_at) index instead of O(page * per_page).
+
+    When ``include_total`` is False the COUNT query is skipped entirely;
+    one extra row is fetched and the second tuple element becomes a
+    has-next flag instead of the total.
+    """
     query = select(Alert).where(Alert.factory_id == factory_id)
     count_query = select(func.count(Alert.id)).where(Alert.factory_id == factory_id)
     
@@ -73,16 +86,23 @@ async def get_all(
         query = query.where(Alert.triggered_at <= end)
         count_query = count_query.where(Alert.triggered_at <= end)
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination
+    # Apply pagination (keyset when a cursor is provided, OFFSET otherwise)
     query = query.order_by(Alert.triggered_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    result = await db.execute(query)
-    return list(result.scalars().all()), total
+    if before is not None:
+        query = query.where(Alert.triggered_at < before)
+    else:
+        query = query.offset((page - 1) * per_page)
+
+    if include_total:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        result = await db.execute(query.limit(per_page))
+        return list(result.scalars().all()), total
+
+    # COUNT-free path: fetch one extra row to detect whether more exist
+    result = await db.execute(query.limit(per_page + 1))
+    rows = list(result.scalars().all())
+    return rows[:per_page], len(rows) > per_page
 
 
 async def get_by_id(
@@ -100,6 +120,26 @@ async def get_by_id(
     return result.scalar_one_or_none()
 
 
+async def get_many_by_ids(
+    db: AsyncSession,
+    factory_id: int,
+    ids: List[int],
+) -> dict:
+    """Get multiple alerts by ID in one query.
+
+    Returns dict of alert_id -> Alert; missing IDs are omitted.
+    """
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Alert).where(
+            Alert.factory_id == factory_id,
+            Alert.id.in_(ids),
+        )
+    )
+    return {a.id: a for a in result.scalars().all()}
+
+
 async def resolve(
     db: AsyncSession,
     factory_id: int,
@@ -137,17 +177,21 @@ async def upsert_cooldown(
     device_id: int,
     last_triggered: datetime,
 ) -> None:
-    """Insert or update cooldown record."""
-    cooldown = await get_cooldown(db, rule_id, device_id)
-    if cooldown:
-        cooldown.last_triggered = last_triggered
-    else:
-        cooldown = RuleCooldown(
-            rule_id=rule_id,
-            device_id=device_id,
-            last_triggered=last_triggered,
-        )
-        db.add(cooldown)
+    """Insert or update cooldown record.
+
+    Uses MySQL's atomic INSERT ... ON DUPLICATE KEY UPDATE against the
+    (rule_id, device_id) primary key: one round trip instead of
+    SELECT-then-INSERT-or-UPDATE, with no race window between two
+    workers touching the same pair.
+    """
+    stmt = mysql_insert(RuleCooldown).values(
+        rule_id=rule_id,
+        device_id=device_id,
+        last_triggered=last_triggered,
+    )
+    await db.execute(
+        stmt.on_duplicate_key_update(last_triggered=stmt.inserted.last_triggered)
+    )
     await db.commit()
 
 
@@ -167,6 +211,30 @@ async def get_active_count_by_device(
     return result.scalar() or 0
 
 
+async def get_active_counts_by_devices(
+    db: AsyncSession,
+    factory_id: int,
+    device_ids: List[int],
+) -> dict:
+    """Get active alert counts for multiple devices in one grouped query.
+
+    Returns dict of device_id -> count; devices with no active alerts
+    are omitted.
+    """
+    if not device_ids:
+        return {}
+    result = await db.execute(
+        select(Alert.device_id, func.count(Alert.id))
+        .where(
+            Alert.factory_id == factory_id,
+            Alert.device_id.in_(device_ids),
+            Alert.resolved_at.is_(None),
+        )
+        .group_by(Alert.device_id)
+    )
+    return {device_id: count for device_id, count in result.all()}
+
+
 async def get_active_count_by_factory(
     db: AsyncSession,
     factory_id: int,
@@ -181,6 +249,27 @@ async def get_active_count_by_factory(
     return result.scalar() or 0
 
 
+async def get_active_severity_counts(
+    db: AsyncSession,
+    factory_id: int,
+) -> dict:
+    """Get active alert counts per severity for a factory in one query.
+
+    Returns dict of severity -> count; severities with no active alerts
+    are omitted. Replaces separate total/critical COUNT round trips on
+    dashboard polls.
+    """
+    result = await db.execute(
+        select(Alert.severity, func.count(Alert.id))
+        .where(
+            Alert.factory_id == factory_id,
+            Alert.resolved_at.is_(None),
+        )
+        .group_by(Alert.severity)
+    )
+    return {severity: count for severity, count in result.all()}
+
+
 async def get_critical_count_by_factory(
     db: AsyncSession,
     factory_id: int,
@@ -18,8 +18,13 @@ async def get_all(
     job_type: Optional[JobType] = None,
     page: int = 1,
     per_page: int = 20,
+    include_total: bool = True,
 ) -> Tuple[List[AnalyticsJob], int]:
-    """Get all analytics jobs for a factory with filtering and pagination."""
+    """Get all analytics jobs for a factory with filtering and pagination.
+
+    With include_total=False the COUNT query is skipped and the second
+    tuple element is a has-next flag derived from fetching one extra row.
+    """
     query = select(AnalyticsJob).where(AnalyticsJob.factory_id == factory_id)
     count_query = select(func.count(AnalyticsJob.id)).where(AnalyticsJob.factory_id == factory_id)
     
@@ -35,17 +40,19 @@ async def get_all(
     # Order by created_at desc
     query = query.order_by(AnalyticsJob.created_at.desc())
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
     # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    result = await db.execute(query)
-    jobs = result.scalars().all()
-    
-    return list(jobs), total
+    query = query.offset((page - 1) * per_page)
+
+    if include_total:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        result = await db.execute(query.limit(per_page))
+        return list(result.scalars().all()), total
+
+    # COUNT-free path: fetch one extra row to detect whether more exist
+    result = await db.execute(query.limit(per_page + 1))
+    jobs = list(result.scalars().all())
+    return jobs[:per_page], len(jobs) > per_page
 
 
 async def get_by_id(
@@ -63,6 +70,26 @@ async def get_by_id(
     return result.scalar_one_or_none()
 
 
+async def get_many_by_ids(
+    db: AsyncSession,
+    factory_id: int,
+    ids: List[str],
+) -> dict:
+    """Get multiple analytics jobs by ID in one query.
+
+    Returns dict of job_id -> AnalyticsJob; missing IDs are omitted.
+    """
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(AnalyticsJob).where(
+            AnalyticsJob.factory_id == factory_id,
+            AnalyticsJob.id.in_(ids),
+        )
+    )
+    return {j.id: j for j in result.scalars().all()}
+
+
 async def create(
     db: AsyncSession,
     job_id: str,
@@ -89,8 +116,7 @@ async def create(
     
     db.add(job)
     await db.commit()
-    await db.refresh(job)
-    
+
     logger.info(
         "analytics_job.created",
         job_id=job_id,
@@ -1,14 +1,36 @@
 """Device repository for database operations."""
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func, update
+from sqlalchemy import bindparam, select, func, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import with_expression
 
 from app.models.device import Device
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+ONLINE_THRESHOLD_MINUTES = 10
+
+# Hot single-row statements, built once at import time so every call reuses
+# the same compiled statement instead of rebuilding and re-caching it.
+_GET_BY_ID_STMT = select(Device).where(
+    Device.factory_id == bindparam("fid"),
+    Device.id == bindparam("did"),
+)
+
+_GET_BY_KEY_STMT = select(Device).where(
+    Device.factory_id == bindparam("fid"),
+    Device.device_key == bindparam("dkey"),
+)
+
+# Online check computed in the same SELECT as the row fetch; COALESCE turns
+# the NULL from a never-seen device into False.
+_ONLINE_EXPR = func.coalesce(
+    Device.last_seen > text(f"UTC_TIMESTAMP() - INTERVAL {ONLINE_THRESHOLD_MINUTES} MINUTE"),
+    False,
+)
+
 
 async def get_all(
     db: AsyncSession,
@@ -17,20 +39,29 @@ async def get_all(
     per_page: int = 20,
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
+    include_total: bool = True,
 ) -> Tuple[List[Device], int]:
     """
     Get all devices for a factory with pagination.
-    
+
     Returns:
-        Tuple of (devices list, total count)
+        Tuple of (devices list, total count). With include_total=False the
+        COUNT query is skipped and the second element is a has-next flag.
     """
-    # Build base query with factory filter
-    query = select(Device).where(Device.factory_id == factory_id)
+    # Build base query with factory filter; is_online rides along as a
+    # computed column instead of a per-row Python check.
+    query = (
+        select(Device)
+        .options(with_expression(Device.is_online, _ONLINE_EXPR))
+        .where(Device.factory_id == factory_id)
+    )
     count_query = select(func.count(Device.id)).where(Device.factory_id == factory_id)
     
     # Apply filters
     if search:
-        search_filter = Device.device_key.ilike(f"%{search}%") | Device.name.ilike(f"%{search}%")
+        # Single predicate over the concatenated columns instead of two
+        # ILIKEs per row; matches either device_key or name.
+        search_filter = func.concat_ws(" ", Device.device_key, Device.name).ilike(f"%{search}%")
         query = query.where(search_filter)
         count_query = count_query.where(search_filter)
     
@@ -38,17 +69,19 @@ async def get_all(
         query = query.where(Device.is_active == is_active)
         count_query = count_query.where(Device.is_active == is_active)
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
     # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    result = await db.execute(query)
-    devices = result.scalars().all()
-    
-    return list(devices), total
+    query = query.offset((page - 1) * per_page)
+
+    if include_total:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        result = await db.execute(query.limit(per_page))
+        return list(result.scalars().all()), total
+
+    # COUNT-free path: fetch one extra row to detect whether more exist
+    result = await db.execute(query.limit(per_page + 1))
+    devices = list(result.scalars().all())
+    return devices[:per_page], len(devices) > per_page
 
 
 async def get_by_id(
@@ -57,13 +90,28 @@ async def get_by_id(
     device_id: int,
 ) -> Optional[Device]:
     """Get device by ID within factory scope."""
+    result = await db.execute(_GET_BY_ID_STMT, {"fid": factory_id, "did": device_id})
+    return result.scalar_one_or_none()
+
+
+async def get_many_by_ids(
+    db: AsyncSession,
+    factory_id: int,
+    ids: List[int],
+) -> dict:
+    """Get multiple devices by ID in one query.
+
+    Returns dict of device_id -> Device; missing IDs are omitted.
+    """
+    if not ids:
+        return {}
     result = await db.execute(
         select(Device).where(
             Device.factory_id == factory_id,
-            Device.id == device_id,
+            Device.id.in_(ids),
         )
     )
-    return result.scalar_one_or_none()
+    return {d.id: d for d in result.scalars().all()}
 
 
 async def get_by_key(
@@ -72,12 +120,7 @@ async def get_by_key(
     device_key: str,
 ) -> Optional[Device]:
     """Get device by device_key within factory scope."""
-    result = await db.execute(
-        select(Device).where(
-            Device.factory_id == factory_id,
-            Device.device_key == device_key,
-        )
-    )
+    result = await db.execute(_GET_BY_KEY_STMT, {"fid": factory_id, "dkey": device_key})
     return result.scalar_one_or_none()
 
 
@@ -98,9 +141,9 @@ async def create(
     )
     
     db.add(device)
+    await db.flush()  # Populate device.id without the extra refresh SELECT
     await db.commit()
-    await db.refresh(device)
-    
+
     logger.info(
         "device.created",
         factory_id=factory_id,
@@ -149,6 +192,7 @@ async def update_last_seen(
         update(Device)
         .where(Device.id == device_id)
         .values(last_seen=timestamp)
+        .execution_options(synchronize_session=False)
     )
     await db.commit()
 
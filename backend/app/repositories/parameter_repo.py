@@ -1,5 +1,8 @@
 """Parameter repository for database operations."""
-from typing import List, Optional
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +12,15 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# In-process TTL cache for parameter metadata. Live-KPI polling reads the
+# same (factory_id, device_id) metadata every few seconds while definitions
+# change on the order of minutes, so a short TTL removes the SELECT + ORM
+# hydration from the hot path. Values are plain tuples, never ORM objects.
+_META_CACHE_TTL = 60.0
+_META_CACHE_MAX = 10_000
+_meta_cache: Dict[Tuple[int, int], Tuple[float, Dict[str, Tuple[Optional[str], Optional[str]]]]] = {}
+_meta_locks: Dict[Tuple[int, int], asyncio.Lock] = {}
+
 
 async def get_all(
     db: AsyncSession,
@@ -25,6 +37,66 @@ async def get_all(
     return list(result.scalars().all())
 
 
+async def get_all_bulk(
+    db: AsyncSession,
+    factory_id: int,
+    device_ids: List[int],
+) -> Dict[int, List[DeviceParameter]]:
+    """Get parameters for multiple devices in a single query.
+
+    Returns a dict of device_id -> parameters, avoiding one SELECT per
+    device when callers iterate a device list.
+    """
+    if not device_ids:
+        return {}
+
+    result = await db.execute(
+        select(DeviceParameter).where(
+            DeviceParameter.factory_id == factory_id,
+            DeviceParameter.device_id.in_(device_ids),
+        )
+    )
+    grouped: Dict[int, List[DeviceParameter]] = defaultdict(list)
+    for param in result.scalars().all():
+        grouped[param.device_id].append(param)
+    return dict(grouped)
+
+
+async def get_meta_cached(
+    db: AsyncSession,
+    factory_id: int,
+    device_id: int,
+) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Get parameter metadata as {parameter_key: (display_name, unit)}.
+
+    Served from a 60s in-process cache; the per-key lock makes concurrent
+    cache misses for the same device share a single SELECT.
+    """
+    key = (factory_id, device_id)
+    entry = _meta_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    lock = _meta_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _meta_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        params = await get_all(db, factory_id, device_id)
+        meta = {p.parameter_key: (p.display_name, p.unit) for p in params}
+
+        if len(_meta_cache) >= _META_CACHE_MAX:
+            _meta_cache.clear()
+        _meta_cache[key] = (time.monotonic() + _META_CACHE_TTL, meta)
+        return meta
+
+
+def invalidate_meta_cache(factory_id: int, device_id: int) -> None:
+    """Drop cached metadata for a device (call after metadata writes)."""
+    _meta_cache.pop((factory_id, device_id), None)
+
+
 async def get_selected_keys(
     db: AsyncSession,
     factory_id: int,
@@ -41,6 +113,32 @@ async def get_selected_keys(
     return [row[0] for row in result.all()]
 
 
+async def get_selected_keys_bulk(
+    db: AsyncSession,
+    factory_id: int,
+    device_ids: List[int],
+) -> Dict[int, List[str]]:
+    """Get selected KPI parameter keys for multiple devices in one query.
+
+    Returns a dict of device_id -> parameter keys. Devices with no
+    selected parameters are omitted.
+    """
+    if not device_ids:
+        return {}
+
+    result = await db.execute(
+        select(DeviceParameter.device_id, DeviceParameter.parameter_key).where(
+            DeviceParameter.factory_id == factory_id,
+            DeviceParameter.device_id.in_(device_ids),
+            DeviceParameter.is_kpi_selected == True,
+        )
+    )
+    grouped: Dict[int, List[str]] = defaultdict(list)
+    for device_id, key in result.all():
+        grouped[device_id].append(key)
+    return dict(grouped)
+
+
 async def get_by_id(
     db: AsyncSession,
     factory_id: int,
@@ -77,7 +175,8 @@ async def update(
     
     await db.commit()
     await db.refresh(param)
-    
+    invalidate_meta_cache(factory_id, device_id)
+
     logger.info(
         "parameter.updated",
         factory_id=factory_id,
@@ -17,8 +17,13 @@ async def get_all(
     status: Optional[ReportStatus] = None,
     page: int = 1,
     per_page: int = 20,
+    include_total: bool = True,
 ) -> Tuple[List[Report], int]:
-    """Get all reports for a factory with filtering and pagination."""
+    """Get all reports for a factory with filtering and pagination.
+
+    With include_total=False the COUNT query is skipped and the second
+    tuple element is a has-next flag derived from fetching one extra row.
+    """
     query = select(Report).where(Report.factory_id == factory_id)
     count_query = select(func.count(Report.id)).where(Report.factory_id == factory_id)
     
@@ -30,17 +35,19 @@ async def get_all(
     # Order by created_at desc
     query = query.order_by(Report.created_at.desc())
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
     # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    result = await db.execute(query)
-    reports = result.scalars().all()
-    
-    return list(reports), total
+    query = query.offset((page - 1) * per_page)
+
+    if include_total:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        result = await db.execute(query.limit(per_page))
+        return list(result.scalars().all()), total
+
+    # COUNT-free path: fetch one extra row to detect whether more exist
+    result = await db.execute(query.limit(per_page + 1))
+    reports = list(result.scalars().all())
+    return reports[:per_page], len(reports) > per_page
 
 
 async def get_by_id(
@@ -58,6 +65,26 @@ async def get_by_id(
     return result.scalar_one_or_none()
 
 
+async def get_many_by_ids(
+    db: AsyncSession,
+    factory_id: int,
+    ids: List[str],
+) -> dict:
+    """Get multiple reports by ID in one query.
+
+    Returns dict of report_id -> Report; missing IDs are omitted.
+    """
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Report).where(
+            Report.factory_id == factory_id,
+            Report.id.in_(ids),
+        )
+    )
+    return {r.id: r for r in result.scalars().all()}
+
+
 async def create(
     db: AsyncSession,
     report_id: str,
@@ -89,8 +116,7 @@ async def create(
     
     db.add(report)
     await db.commit()
-    await db.refresh(report)
-    
+
     logger.info(
         "report.created",
         report_id=report_id,
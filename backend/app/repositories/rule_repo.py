@@ -19,8 +19,13 @@ async def get_all(
     scope: Optional[str] = None,
     page: int = 1,
     per_page: int = 20,
+    include_total: bool = True,
 ) -> Tuple[List[Rule], int]:
-    """Get all rules for a factory with filtering and pagination."""
+    """Get all rules for a factory with filtering and pagination.
+
+    With include_total=False the COUNT query is skipped and the second
+    tuple element is a has-next flag derived from fetching one extra row.
+    """
     query = select(Rule).where(Rule.factory_id == factory_id)
     count_query = select(func.count(Rule.id)).where(Rule.factory_id == factory_id)
     
@@ -44,17 +49,19 @@ async def get_all(
         query = query.where(Rule.scope == scope)
         count_query = count_query.where(Rule.scope == scope)
     
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
     # Apply pagination
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    
-    result = await db.execute(query)
-    rules = result.scalars().unique().all()
-    
-    return list(rules), total
+    query = query.offset((page - 1) * per_page)
+
+    if include_total:
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        result = await db.execute(query.limit(per_page))
+        return list(result.scalars().unique().all()), total
+
+    # COUNT-free path: fetch one extra row to detect whether more exist
+    result = await db.execute(query.limit(per_page + 1))
+    rules = list(result.scalars().unique().all())
+    return rules[:per_page], len(rules) > per_page
 
 
 async def get_by_id(
@@ -72,16 +79,49 @@ async def get_by_id(
     return result.scalar_one_or_none()
 
 
+async def get_many_by_ids(
+    db: AsyncSession,
+    factory_id: int,
+    ids: List[int],
+) -> dict:
+    """Get multiple rules by ID in one query.
+
+    Returns dict of rule_id -> Rule; missing IDs are omitted.
+    """
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Rule).where(
+            Rule.factory_id == factory_id,
+            Rule.id.in_(ids),
+        )
+    )
+    return {r.id: r for r in result.scalars().all()}
+
+
 async def get_active_for_device(
     db: AsyncSession,
     factory_id: int,
     device_id: int,
-) -> List[Rule]:
+) -> List[dict]:
     """
     Get all active rules applicable to a device.
     Returns global rules + device-specific rules for this device.
+
+    Returns plain dicts of the fields the rule engine evaluates (enums
+    coerced to their values) rather than ORM objects: the hot path never
+    touches attribute descriptors and the result serializes directly.
     """
-    query = select(Rule).where(
+    query = select(
+        Rule.id,
+        Rule.name,
+        Rule.conditions,
+        Rule.cooldown_minutes,
+        Rule.severity,
+        Rule.schedule_type,
+        Rule.schedule_config,
+        Rule.notification_channels,
+    ).where(
         Rule.factory_id == factory_id,
         Rule.is_active == True,
     ).outerjoin(
@@ -91,10 +131,22 @@ async def get_active_for_device(
             Rule.scope == "global",
             rule_devices.c.device_id == device_id
         )
-    )
-    
+    ).distinct()
+
     result = await db.execute(query)
-    return list(result.scalars().unique().all())
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "conditions": row.conditions,
+            "cooldown_minutes": row.cooldown_minutes,
+            "severity": row.severity.value,
+            "schedule_type": row.schedule_type.value,
+            "schedule_config": row.schedule_config,
+            "notification_channels": row.notification_channels,
+        }
+        for row in result
+    ]
 
 
 async def create(
@@ -135,8 +187,7 @@ async def create(
             )
     
     await db.commit()
-    await db.refresh(rule)
-    
+
     logger.info(
         "rule.created",
         factory_id=factory_id,
@@ -1,33 +1,90 @@
-"""User repository for database operations."""
-from datetime import datetime, timedelta
+"""User repository for database operations.
+
+Write functions here do not commit; ``get_db`` commits once at the end of
+the request, so endpoints chaining several user writes pay for one commit
+instead of one per write.
+"""
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, UserRole
 
 
-async def get_by_id(db: AsyncSession, factory_id: int, user_id: int) -> Optional[User]:
-    """Get user by ID within a factory."""
-    result = await db.execute(
-        select(User).where(
-            User.id == user_id,
-            User.factory_id == factory_id,
-        )
-    )
-    return result.scalar_one_or_none()
+# Hot single-row statements, built once at import time so every call reuses
+# the same compiled statement instead of rebuilding and re-caching it.
+_GET_BY_ID_STMT = select(User).where(
+    User.id == bindparam("uid"),
+    User.factory_id == bindparam("fid"),
+)
+
+_GET_BY_EMAIL_STMT = select(User).where(
+    User.factory_id == bindparam("fid"),
+    User.email == bindparam("email"),
+)
+
+# Tokens are unique random strings with a unique index, so the lookup is a
+# single-column point read; the pending-invite check happens in Python.
+_GET_BY_INVITE_TOKEN_STMT = select(User).where(
+    User.invite_token == bindparam("token"),
+)
+
+# UTC_TIMESTAMP() keeps the stored value naive-UTC like the rest of the
+# schema while using the DB clock, so the statement text and binds are
+# identical on every login.
+_UPDATE_LAST_LOGIN_STMT = (
+    update(User)
+    .where(User.id == bindparam("uid"))
+    .values(last_login=func.utc_timestamp())
+    .execution_options(synchronize_session=False)
+)
+
+
+async def get_by_id(
+    db: AsyncSession,
+    factory_id: int,
+    user_id: int,
+    cache: Optional[Dict[Any, User]] = None,
+) -> Optional[User]:
+    """Get user by ID within a factory.
 
+    ``cache`` is an optional request-scoped dict; repeat lookups for the
+    same user within one request are served from it without a SELECT. The
+    strong reference also keeps the instance out of identity-map GC.
+    """
+    key = ("id", factory_id, user_id)
+    if cache is not None and key in cache:
+        return cache[key]
 
-async def get_by_email(db: AsyncSession, factory_id: int, email: str) -> Optional[User]:
-    """Get user by email within a factory."""
-    result = await db.execute(
-        select(User).where(
-            User.factory_id == factory_id,
-            User.email == email,
-        )
-    )
-    return result.scalar_one_or_none()
+    result = await db.execute(_GET_BY_ID_STMT, {"uid": user_id, "fid": factory_id})
+    user = result.scalar_one_or_none()
+
+    if cache is not None and user is not None:
+        cache[key] = user
+    return user
+
+
+async def get_by_email(
+    db: AsyncSession,
+    factory_id: int,
+    email: str,
+    cache: Optional[Dict[Any, User]] = None,
+) -> Optional[User]:
+    """Get user by email within a factory.
+
+    Supports the same optional request-scoped ``cache`` as ``get_by_id``.
+    """
+    key = ("email", factory_id, email)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    result = await db.execute(_GET_BY_EMAIL_STMT, {"fid": factory_id, "email": email})
+    user = result.scalar_one_or_none()
+
+    if cache is not None and user is not None:
+        cache[key] = user
+    return user
 
 
 async def get_all(db: AsyncSession, factory_id: int) -> List[User]:
@@ -57,12 +114,13 @@ async def create(
         permissions=permissions,
         whatsapp_number=whatsapp_number,
         invite_token=invite_token,
-        invited_at=datetime.utcnow() if invite_token else None,
+        # DB clock, not the app's; the invite path never reads this back
+        # from the in-memory instance.
+        invited_at=func.utc_timestamp() if invite_token else None,
         is_active=invite_token is None,
     )
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()  # Populate user.id without the extra refresh SELECT
     return user
 
 
@@ -73,18 +131,12 @@ async def update_permissions(
     permissions: Dict[str, Any],
 ) -> Optional[User]:
     """Update user permissions."""
-    result = await db.execute(
-        update(User)
-        .where(
-            User.id == user_id,
-            User.factory_id == factory_id,
-            User.role != UserRole.SUPER_ADMIN,
-        )
-        .values(permissions=permissions)
-        .returning(User)
-    )
-    await db.commit()
-    return result.scalar_one_or_none()
+    user = await get_by_id(db, factory_id, user_id)
+    if not user or user.role == UserRole.SUPER_ADMIN:
+        return None
+
+    user.permissions = permissions
+    return user
 
 
 async def deactivate(
@@ -93,29 +145,21 @@ async def deactivate(
     user_id: int,
 ) -> Optional[User]:
     """Deactivate a user (soft delete)."""
-    result = await db.execute(
-        update(User)
-        .where(
-            User.id == user_id,
-            User.factory_id == factory_id,
-            User.role != UserRole.SUPER_ADMIN,
-        )
-        .values(is_active=False)
-        .returning(User)
-    )
-    await db.commit()
-    return result.scalar_one_or_none()
+    user = await get_by_id(db, factory_id, user_id)
+    if not user or user.role == UserRole.SUPER_ADMIN:
+        return None
+
+    user.is_active = False
+    return user
 
 
 async def get_by_invite_token(db: AsyncSession, token: str) -> Optional[User]:
-    """Get user by invite token."""
-    result = await db.execute(
-        select(User).where(
-            User.invite_token == token,
-            User.is_active == False,
-        )
-    )
-    return result.scalar_one_or_none()
+    """Get user by invite token. Returns None if the invite was already used."""
+    result = await db.execute(_GET_BY_INVITE_TOKEN_STMT, {"token": token})
+    user = result.scalar_one_or_none()
+    if user is None or user.is_active:
+        return None
+    return user
 
 
 async def set_password_and_activate(
@@ -124,26 +168,17 @@ async def set_password_and_activate(
     hashed_password: str,
 ) -> Optional[User]:
     """Set password and activate user after invite acceptance."""
-    result = await db.execute(
-        update(User)
-        .where(User.id == user_id)
-        .values(
-            hashed_password=hashed_password,
-            is_active=True,
-            invite_token=None,
-            invited_at=None,
-        )
-        .returning(User)
-    )
-    await db.commit()
-    return result.scalar_one_or_none()
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+
+    user.hashed_password = hashed_password
+    user.is_active = True
+    user.invite_token = None
+    user.invited_at = None
+    return user
 
 
 async def update_last_login(db: AsyncSession, user_id: int) -> None:
     """Update user's last login timestamp."""
-    await db.execute(
-        update(User)
-        .where(User.id == user_id)
-        .values(last_login=datetime.utcnow())
-    )
-    await db.commit()
+    await db.execute(_UPDATE_LAST_LOGIN_STMT, {"uid": user_id})
@@ -1,4 +1,4 @@
 """Services exports."""
-from app.services import device_service, kpi_service, telemetry_fetcher
+from app.services import device_service, kpi_service, rule_cache, telemetry_fetcher
 
-__all__ = ["device_service", "kpi_service", "telemetry_fetcher"]
+__all__ = ["device_service", "kpi_service", "rule_cache", "telemetry_fetcher"]
@@ -1,36 +1,20 @@
 """Device service with business logic."""
 import secrets
-from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories import device_repo, parameter_repo, alert_repo
-from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceListItem, DeviceResponse
+from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceResponse
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 # Health calculation constants
-ONLINE_THRESHOLD_MINUTES = 10
 HEALTH_BASE_SCORE = 100
 HEALTH_PENALTY_PER_ALERT = 10
 
 
-def _is_device_online(last_seen: Optional[datetime]) -> bool:
-    """Check if device is considered online (last seen within threshold)."""
-    if not last_seen:
-        return False
-    
-    # Handle timezone-aware vs naive datetimes
-    now = datetime.utcnow()
-    if last_seen.tzinfo:
-        now = datetime.now(last_seen.tzinfo)
-    
-    threshold = now - timedelta(minutes=ONLINE_THRESHOLD_MINUTES)
-    return last_seen > threshold
-
-
 def _calculate_health_score(is_online: bool, active_alert_count: int) -> int:
     """Calculate device health score."""
     if not is_online:
@@ -47,46 +31,50 @@ async def list_devices(
     per_page: int = 20,
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
-) -> Tuple[List[DeviceListItem], int]:
+) -> Tuple[List[dict], int]:
     """
     List devices with computed fields.
-    
+
+    Rows are plain dicts shaped like DeviceListItem; the list endpoint
+    hands them straight to orjson without a per-row model round trip.
+
     Returns:
-        Tuple of (device list items, total count)
+        Tuple of (device row dicts, total count)
     """
     devices, total = await device_repo.get_all(
         db, factory_id, page, per_page, search, is_active
     )
     
-    device_items = []
+    # Get active alert counts for the whole page in one grouped query
+    alert_counts = await alert_repo.get_active_counts_by_devices(
+        db, factory_id, [d.id for d in devices]
+    )
+
+    rows = []
     for device in devices:
-        # Get active alert count
-        alert_count = await alert_repo.get_active_count_by_device(
-            db, factory_id, device.id
-        )
-        
-        # Calculate health score
-        is_online = _is_device_online(device.last_seen)
-        health_score = _calculate_health_score(is_online, alert_count)
-        
+        alert_count = alert_counts.get(device.id, 0)
+
+        # Calculate health score (is_online comes computed from the SELECT)
+        health_score = _calculate_health_score(bool(device.is_online), alert_count)
+
         # TODO: Calculate current_energy_kw from InfluxDB
         current_energy_kw = 0.0  # Placeholder
-        
-        device_items.append(DeviceListItem(
-            id=device.id,
-            device_key=device.device_key,
-            name=device.name,
-            manufacturer=device.manufacturer,
-            model=device.model,
-            region=device.region,
-            is_active=device.is_active,
-            last_seen=device.last_seen,
-            health_score=health_score,
-            current_energy_kw=current_energy_kw,
-            active_alert_count=alert_count,
-        ))
-    
-    return device_items, total
+
+        rows.append({
+            "id": device.id,
+            "device_key": device.device_key,
+            "name": device.name,
+            "manufacturer": device.manufacturer,
+            "model": device.model,
+            "region": device.region,
+            "is_active": device.is_active,
+            "last_seen": device.last_seen,
+            "health_score": health_score,
+            "current_energy_kw": current_energy_kw,
+            "active_alert_count": alert_count,
+        })
+
+    return rows, total
 
 
 async def get_device(
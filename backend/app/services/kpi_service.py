@@ -4,7 +4,7 @@ from typing import List, Optional
 
 from app.core.config import settings
 from app.core.influx import get_influx_client
-from app.schemas.kpi import KPIValue, DataPoint
+from app.schemas.kpi import KPIValue
 from app.repositories import parameter_repo
 from app.core.logging import get_logger
 
@@ -14,6 +14,42 @@ LIVE_WINDOW_MINUTES = 5
 STALE_THRESHOLD_MINUTES = 10
 
 
+# Static Flux templates: values are bound as query params instead of being
+# f-string interpolated, so the query text is bytewise-identical across
+# requests (server-side plan reuse) and tag values are never injectable.
+_LIVE_KPIS_FLUX = f'''
+from(bucket: "{settings.influxdb_bucket}")
+    |> range(start: -{LIVE_WINDOW_MINUTES}m)
+    |> filter(fn: (r) => r._measurement == "device_metrics")
+    |> filter(fn: (r) => r.factory_id == factoryId)
+    |> filter(fn: (r) => r.device_id == deviceId)
+    |> filter(fn: (r) => contains(value: r.parameter, set: paramKeys))
+    |> last()
+'''
+
+_KPI_HISTORY_FLUX = f'''
+from(bucket: "{settings.influxdb_bucket}")
+    |> range(start: windowStart, stop: windowStop)
+    |> filter(fn: (r) => r._measurement == "device_metrics")
+    |> filter(fn: (r) => r.factory_id == factoryId)
+    |> filter(fn: (r) => r.device_id == deviceId)
+    |> filter(fn: (r) => r.parameter == paramKey)
+    |> aggregateWindow(every: duration(v: windowEvery), fn: mean, createEmpty: false)
+    |> yield(name: "mean")
+'''
+
+
+def _to_datetime(value):
+    """Normalize an Influx record time to datetime.
+
+    The async client already yields datetime objects for _time; the string
+    branch is a fallback so we only pay for parsing when it actually occurs.
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
 async def get_live_kpis(
     factory_id: int,
     device_id: int,
@@ -28,59 +64,52 @@ async def get_live_kpis(
     """
     if not selected_params:
         return []
-    
-    # Build Flux query
-    params_filter = " or ".join([f'r.parameter == "{p}"' for p in selected_params])
-    
-    flux = f'''
-    from(bucket: "{settings.influxdb_bucket}")
-        |> range(start: -{LIVE_WINDOW_MINUTES}m)
-        |> filter(fn: (r) => r._measurement == "device_metrics")
-        |> filter(fn: (r) => r.factory_id == "{factory_id}")
-        |> filter(fn: (r) => r.device_id == "{device_id}")
-        |> filter(fn: (r) => {params_filter})
-        |> last()
-    '''
-    
+
     try:
+        # Metadata first (TTL-cached): intersecting up front means the Flux
+        # filter only asks Influx for parameters that actually exist, so
+        # unknown keys never cross the wire or get filtered in Python.
+        param_meta = await parameter_repo.get_meta_cached(db, factory_id, device_id)
+        known_params = [p for p in selected_params if p in param_meta]
+        if not known_params:
+            return []
+
         influx = get_influx_client()
-        records = await influx.query(flux)
-        
-        # Get parameter metadata for display names and units
-        all_params = await parameter_repo.get_all(db, factory_id, device_id)
-        param_meta = {p.parameter_key: p for p in all_params}
-        
+        records = await influx.query(
+            _LIVE_KPIS_FLUX,
+            params={
+                "factoryId": str(factory_id),
+                "deviceId": str(device_id),
+                "paramKeys": known_params,
+            },
+        )
+
         kpis = []
         now = datetime.now(timezone.utc)
         stale_threshold = now - timedelta(minutes=STALE_THRESHOLD_MINUTES)
-        
+
         for record in records:
+            # Every record matched the contains() filter, so the parameter
+            # tag is always present and has metadata.
             param_key = record.values.get("parameter")
-            if not param_key:
-                continue
-            
             value = record.values.get("_value")
             record_time = record.values.get("_time")
             
             # Check if stale (older than threshold)
             is_stale = False
             if record_time:
-                if isinstance(record_time, str):
-                    record_time = datetime.fromisoformat(record_time.replace('Z', '+00:00'))
-                is_stale = record_time < stale_threshold
-            
-            # Get metadata
-            meta = param_meta.get(param_key)
+                is_stale = _to_datetime(record_time) < stale_threshold
             
+            meta = param_meta[param_key]
+
             kpis.append(KPIValue(
                 parameter_key=param_key,
-                display_name=meta.display_name if meta else param_key,
-                unit=meta.unit if meta else None,
+                display_name=meta[0] or param_key,
+                unit=meta[1],
                 value=float(value) if value else 0.0,
                 is_stale=is_stale,
             ))
         
-        await influx.close()
         return kpis
         
     except Exception as e:
@@ -100,10 +129,14 @@ async def get_kpi_history(
     start: datetime,
     end: datetime,
     interval: Optional[str] = None,
-) -> List[DataPoint]:
+) -> List[dict]:
     """
     Get KPI history data for charting.
-    
+
+    Points are plain DataPoint-shaped dicts; the endpoint hands them
+    straight to orjson, avoiding one model instance per point on wide
+    time ranges.
+
     Auto-selects interval if not provided:
     - range < 2h → 1m
     - range < 24h → 5m
@@ -122,21 +155,19 @@ async def get_kpi_history(
         else:
             interval = "1d"
     
-    # Build Flux query
-    flux = f'''
-    from(bucket: "{settings.influxdb_bucket}")
-        |> range(start: {start.isoformat()}Z, stop: {end.isoformat()}Z)
-        |> filter(fn: (r) => r._measurement == "device_metrics")
-        |> filter(fn: (r) => r.factory_id == "{factory_id}")
-        |> filter(fn: (r) => r.device_id == "{device_id}")
-        |> filter(fn: (r) => r.parameter == "{parameter}")
-        |> aggregateWindow(every: {interval}, fn: mean, createEmpty: false)
-        |> yield(name: "mean")
-    '''
-    
     try:
         influx = get_influx_client()
-        records = await influx.query(flux)
+        records = await influx.query(
+            _KPI_HISTORY_FLUX,
+            params={
+                "factoryId": str(factory_id),
+                "deviceId": str(device_id),
+                "paramKey": parameter,
+                "windowStart": start.replace(tzinfo=timezone.utc),
+                "windowStop": end.replace(tzinfo=timezone.utc),
+                "windowEvery": interval,
+            },
+        )
         
         points = []
         for record in records:
@@ -144,14 +175,11 @@ async def get_kpi_history(
             value = record.values.get("_value")
             
             if timestamp and value is not None:
-                if isinstance(timestamp, str):
-                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                points.append(DataPoint(
-                    timestamp=timestamp,
-                    value=float(value),
-                ))
+                points.append({
+                    "timestamp": _to_datetime(timestamp),
+                    "value": float(value),
+                })
         
-        await influx.close()
         return points
         
     except Exception as e:
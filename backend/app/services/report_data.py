@@ -2,7 +2,6 @@
 from datetime import datetime
 from typing import List, Dict, Any
 
-import pandas as pd
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,7 +9,7 @@ from app.core.config import settings
 from app.core.influx import get_influx_client
 from app.core.logging import get_logger
 from app.repositories import device_repo, alert_repo
-from app.services.telemetry_fetcher import fetch_as_dataframe
+from app.services.telemetry_fetcher import fetch_summary
 
 logger = get_logger(__name__)
 
@@ -42,10 +41,11 @@ async def get_report_data(
         end=end.isoformat(),
     )
     
-    # Fetch device metadata
+    # Fetch device metadata in one IN-query instead of one SELECT per device
+    device_map = await device_repo.get_many_by_ids(db, factory_id, device_ids)
     devices = []
     for device_id in device_ids:
-        device = await device_repo.get_by_id(db, factory_id, device_id)
+        device = device_map.get(device_id)
         if device:
             devices.append({
                 "id": device.id,
@@ -57,34 +57,24 @@ async def get_report_data(
                 "last_seen": device.last_seen.isoformat() if device.last_seen else None,
             })
     
-    # Fetch telemetry data and calculate summary statistics
+    # Summary statistics computed inside InfluxDB; only the aggregates
+    # cross the wire, never the raw samples.
     telemetry_summary = {}
     try:
-        df = await fetch_as_dataframe(factory_id, device_ids, start, end)
-        
-        if not df.empty:
-            # Group by device and calculate stats per parameter
-            for device_id in device_ids:
-                device_df = df[df["device_id"] == device_id]
-                if device_df.empty:
-                    continue
-                
-                device_stats = {}
-                # Get numeric columns (exclude timestamp and device_id)
-                numeric_cols = device_df.select_dtypes(include=["number"]).columns.tolist()
-                parameter_cols = [c for c in numeric_cols if c not in ["device_id"]]
-                
-                for param in parameter_cols:
-                    values = device_df[param].dropna()
-                    if len(values) > 0:
-                        device_stats[param] = {
-                            "min": round(float(values.min()), 2),
-                            "max": round(float(values.max()), 2),
-                            "avg": round(float(values.mean()), 2),
-                            "count": int(len(values)),
-                        }
-                
-                telemetry_summary[f"device_{device_id}"] = device_stats
+        raw_summary = await fetch_summary(factory_id, device_ids, start, end)
+
+        for device_id, params in raw_summary.items():
+            device_stats = {}
+            for param, stats in params.items():
+                count = int(stats.get("count", 0))
+                if count > 0 and "mean" in stats:
+                    device_stats[param] = {
+                        "min": round(stats["min"], 2),
+                        "max": round(stats["max"], 2),
+                        "avg": round(stats["mean"], 2),
+                        "count": count,
+                    }
+            telemetry_summary[f"device_{device_id}"] = device_stats
     except Exception as e:
         logger.error("report_data.telemetry_error", error=str(e))
         telemetry_summary = {}
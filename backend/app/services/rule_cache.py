@@ -0,0 +1,73 @@
+"""Redis-backed cache of active rules per device.
+
+The rule engine fires on every telemetry write but rules only change
+when someone edits them in the UI, so the active-rule set for a device
+is cached with a short TTL. Rule mutations invalidate the factory's
+keys explicitly; the TTL is just a backstop.
+"""
+from typing import Any, Dict, List
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis_client
+from app.repositories import rule_repo
+
+logger = get_logger(__name__)
+
+# Short TTL: invalidation on rule CRUD is the primary mechanism, the
+# expiry only bounds staleness if an invalidation is missed.
+RULES_CACHE_TTL = 60
+
+
+def _cache_key(factory_id: int, device_id: int) -> str:
+    return f"rules:{factory_id}:{device_id}"
+
+
+async def get_active_rules(
+    db: AsyncSession,
+    factory_id: int,
+    device_id: int,
+) -> List[Dict[str, Any]]:
+    """Get active rules for a device, served from Redis when cached.
+
+    Returns plain dicts whether the data came from the cache or the DB;
+    the repository already emits them in evaluation shape. Redis trouble
+    degrades to a DB fetch — rule evaluation must not depend on the
+    cache being up.
+    """
+    key = _cache_key(factory_id, device_id)
+    redis = get_redis_client()
+
+    try:
+        cached = await redis.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning("rule_cache.read_failed", key=key, error=str(e))
+
+    payload = await rule_repo.get_active_for_device(db, factory_id, device_id)
+
+    try:
+        await redis.setex(key, RULES_CACHE_TTL, orjson.dumps(payload))
+    except Exception as e:
+        logger.warning("rule_cache.write_failed", key=key, error=str(e))
+
+    return payload
+
+
+async def invalidate(factory_id: int) -> None:
+    """Drop all cached rule sets for a factory after a rule mutation.
+
+    Uses SCAN rather than KEYS so invalidation never blocks Redis on a
+    large keyspace. Failures are logged, not raised: the TTL bounds how
+    long a stale set can survive.
+    """
+    redis = get_redis_client()
+    pattern = f"rules:{factory_id}:*"
+    try:
+        async for key in redis.scan_iter(match=pattern, count=100):
+            await redis.delete(key)
+    except Exception as e:
+        logger.warning("rule_cache.invalidate_failed", factory_id=factory_id, error=str(e))
@@ -1,7 +1,9 @@
 """Telemetry data fetcher service for analytics."""
+import asyncio
 import json
-from datetime import datetime
-from typing import List, Optional
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import numpy as np
@@ -12,6 +14,34 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# In-process TTL cache for pivoted frames. Analytics jobs, reports, and the
+# AI copilot frequently ask for the same (factory, devices, window) within
+# minutes of each other; telemetry is append-only, so a short TTL is safe.
+# Entries are copied on the way in and out since consumers mutate frames.
+_DF_CACHE_TTL = 300.0
+_DF_CACHE_MAX = 32
+_df_cache: Dict[Tuple, Tuple[float, pd.DataFrame]] = {}
+_df_locks: Dict[Tuple, asyncio.Lock] = {}
+
+# Summary statistics computed inside InfluxDB: four reductions over the
+# grouped series, returned as one row per (device, parameter, stat). Raw
+# samples never cross the wire. Values are bound as query params.
+_SUMMARY_FLUX = f'''
+data = from(bucket: "{settings.influxdb_bucket}")
+    |> range(start: windowStart, stop: windowStop)
+    |> filter(fn: (r) => r._measurement == "device_metrics")
+    |> filter(fn: (r) => r.factory_id == factoryId)
+    |> filter(fn: (r) => contains(value: r.device_id, set: deviceIds))
+    |> group(columns: ["device_id", "parameter"])
+
+union(tables: [
+    data |> min() |> set(key: "stat", value: "min"),
+    data |> max() |> set(key: "stat", value: "max"),
+    data |> mean() |> set(key: "stat", value: "mean"),
+    data |> count() |> set(key: "stat", value: "count"),
+])
+'''
+
 
 async def fetch_as_dataframe(
     factory_id: int,
@@ -20,13 +50,17 @@ async def fetch_as_dataframe(
     end: datetime,
 ) -> pd.DataFrame:
     """Fetch telemetry data from InfluxDB and return as pivoted DataFrame.
-    
+
+    Results are served from a short in-process TTL cache keyed by
+    (factory, device set, window), so overlapping analytics/report calls
+    share one Flux query. Callers get their own copy and may mutate it.
+
     Args:
         factory_id: Factory ID for filtering
         device_ids: List of device IDs to fetch data for
         start: Start datetime
         end: End datetime
-        
+
     Returns:
         DataFrame with columns: timestamp, device_id, <parameter columns...>
         Each parameter becomes its own column (wide format)
@@ -34,7 +68,33 @@ async def fetch_as_dataframe(
     if not device_ids:
         logger.warning("telemetry_fetch.no_devices", factory_id=factory_id)
         return pd.DataFrame()
-    
+
+    key = (factory_id, tuple(sorted(device_ids)), start, end)
+    entry = _df_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1].copy()
+
+    lock = _df_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _df_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1].copy()
+
+        df = await _query_dataframe(factory_id, device_ids, start, end)
+
+        if len(_df_cache) >= _DF_CACHE_MAX:
+            _df_cache.clear()
+        _df_cache[key] = (time.monotonic() + _DF_CACHE_TTL, df.copy())
+        return df
+
+
+async def _query_dataframe(
+    factory_id: int,
+    device_ids: List[int],
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    """Issue the Flux query and pivot the result (uncached)."""
     # Build Flux query
     device_id_strs = [str(did) for did in device_ids]
     flux = f'''
@@ -47,49 +107,53 @@ async def fetch_as_dataframe(
     
     try:
         client = get_influx_client()
-        records = await client.query(flux)
-        
-        if not records:
+        # Annotated-CSV straight into a frame: no per-record FluxRecord
+        # objects or Python-side column appends.
+        raw = await client.query_dataframe(flux)
+        if isinstance(raw, list):
+            raw = pd.concat(raw, ignore_index=True) if raw else pd.DataFrame()
+
+        if raw.empty:
             logger.info(
                 "telemetry_fetch.no_data",
                 factory_id=factory_id,
-                device_ids=device_ids,
+                device_count=len(device_ids),
                 start=start.isoformat(),
                 end=end.isoformat(),
             )
             return pd.DataFrame()
-        
-        # Extract records into list of dicts
-        rows = []
-        for table in records:
-            for record in table.records:
-                rows.append({
-                    "timestamp": record.get_time(),
-                    "device_id": record.values.get("device_id"),
-                    "parameter": record.values.get("parameter"),
-                    "value": record.get_value(),
-                })
-        
-        if not rows:
-            return pd.DataFrame()
-        
-        # Create DataFrame
-        df = pd.DataFrame(rows)
-        
-        # Convert device_id to int for consistency
-        df["device_id"] = df["device_id"].astype(int)
-        
-        # Pivot to wide format: timestamp + device_id as index, parameters as columns
-        df_pivot = df.pivot_table(
+
+        df = raw[["_time", "device_id", "parameter", "_value"]].rename(
+            columns={"_time": "timestamp", "_value": "value"}
+        )
+        df["device_id"] = df["device_id"].astype(np.int64)
+        df["value"] = df["value"].astype(np.float64)
+
+        # Pivot to wide format: timestamp + device_id as index, parameters as
+        # columns. Duplicates are rare, so only pay for the groupby-mean when
+        # they actually exist; the plain pivot is a pure reshape.
+        if df.duplicated(subset=["timestamp", "device_id", "parameter"]).any():
+            df = (
+                df.groupby(["timestamp", "device_id", "parameter"], sort=False)["value"]
+                .mean()
+                .reset_index()
+            )
+        df_pivot = df.pivot(
             index=["timestamp", "device_id"],
             columns="parameter",
             values="value",
-            aggfunc="mean",  # In case of duplicates, take mean
         ).reset_index()
         
         # Flatten column names
         df_pivot.columns.name = None
-        
+
+        # float32 halves frame RAM and memory traffic in the downstream
+        # rolling/scoring passes; sensor readings nowhere near need the
+        # extra mantissa. Timestamps stay datetime64[ns].
+        param_cols = df_pivot.select_dtypes(include=["float64"]).columns
+        df_pivot[param_cols] = df_pivot[param_cols].astype(np.float32)
+        df_pivot["device_id"] = df_pivot["device_id"].astype(np.int32)
+
         logger.info(
             "telemetry_fetch.success",
             factory_id=factory_id,
@@ -99,7 +163,7 @@ async def fetch_as_dataframe(
         )
         
         return df_pivot
-        
+
     except Exception as e:
         logger.error(
             "telemetry_fetch.error",
@@ -108,3 +172,59 @@ async def fetch_as_dataframe(
             error_type=type(e).__name__,
         )
         raise
+
+
+async def fetch_summary(
+    factory_id: int,
+    device_ids: List[int],
+    start: datetime,
+    end: datetime,
+) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """Fetch per-parameter summary statistics computed inside InfluxDB.
+
+    Returns {device_id: {parameter: {"min": ..., "max": ..., "mean": ...,
+    "count": ...}}}. Use this instead of fetch_as_dataframe when only the
+    aggregates are needed — the raw samples stay on the Influx side.
+    """
+    if not device_ids:
+        logger.warning("telemetry_summary.no_devices", factory_id=factory_id)
+        return {}
+
+    try:
+        client = get_influx_client()
+        records = await client.query(
+            _SUMMARY_FLUX,
+            params={
+                "factoryId": str(factory_id),
+                "deviceIds": [str(did) for did in device_ids],
+                "windowStart": start.replace(tzinfo=timezone.utc),
+                "windowStop": end.replace(tzinfo=timezone.utc),
+            },
+        )
+
+        summary: Dict[int, Dict[str, Dict[str, float]]] = {}
+        for table in records:
+            for record in table.records:
+                device_id = record.values.get("device_id")
+                parameter = record.values.get("parameter")
+                stat = record.values.get("stat")
+                value = record.get_value()
+                if device_id is None or parameter is None or value is None:
+                    continue
+                summary.setdefault(int(device_id), {}).setdefault(parameter, {})[stat] = float(value)
+
+        logger.info(
+            "telemetry_summary.success",
+            factory_id=factory_id,
+            device_count=len(summary),
+        )
+        return summary
+
+    except Exception as e:
+        logger.error(
+            "telemetry_summary.error",
+            factory_id=factory_id,
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+        raise
@@ -7,7 +7,7 @@ from app.workers.analytics import (
     run_ai_copilot,
 )
 from app.workers.analytics_task import run_analytics_job
-from app.workers.reporting import generate_pdf, generate_excel
+from app.workers.reporting import generate_pdf, generate_excel, generate_parquet
 from app.workers.reporting_task import generate_report_task
 
 __all__ = [
@@ -19,5 +19,6 @@ __all__ = [
     "run_analytics_job",
     "generate_pdf",
     "generate_excel",
+    "generate_parquet",
     "generate_report_task",
 ]
@@ -1,15 +1,11 @@
 """Analytics Celery task for running ML jobs."""
-import asyncio
 import uuid
 from datetime import datetime
 from typing import Optional
 
-from asgiref.sync import async_to_sync
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import pandas as pd
 
-from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.minio_client import get_minio_client
 from app.core.logging import get_logger
 from app.workers.celery_app import celery_app
@@ -20,21 +16,15 @@ from app.workers.analytics import (
     run_ai_copilot,
 )
 from app.services.telemetry_fetcher import fetch_as_dataframe
+from app.workers.event_loop import run_async
 from app.models.analytics_job import AnalyticsJob, JobStatus, JobType
 
 logger = get_logger(__name__)
 
-# Create sync engine for Celery task (Celery runs sync code)
-sync_engine = create_engine(
-    settings.database_url.replace("+aiomysql", "+pymysql"),
-    pool_pre_ping=True,
-)
-SyncSessionLocal = sessionmaker(bind=sync_engine)
-
 
 def get_job_sync(job_id: str) -> Optional[AnalyticsJob]:
     """Get job by ID using sync session."""
-    with SyncSessionLocal() as session:
+    with SessionLocal() as session:
         return session.get(AnalyticsJob, job_id)
 
 
@@ -46,7 +36,7 @@ def update_job_status_sync(
     results: Optional[dict] = None,
 ) -> None:
     """Update job status using sync session."""
-    with SyncSessionLocal() as session:
+    with SessionLocal() as session:
         job = session.get(AnalyticsJob, job_id)
         if not job:
             logger.error("analytics_job.not_found", job_id=job_id)
@@ -76,6 +66,29 @@ def update_job_status_sync(
         )
 
 
+def _externalize_forecast(minio_client, factory_id: int, job_id: str, results: dict) -> None:
+    """Move bulky forecast rows out of the JSON result into Parquet.
+
+    The forecast can run to horizon_days * 24 rows of four floats each;
+    as Parquet it is 5-10x smaller than JSON and faster to parse back.
+    The JSON result keeps the metadata plus a presigned ``parquet_url``
+    pointer; consumers load the rows with ``pd.read_parquet``.
+    """
+    container = results
+    if isinstance(results.get("results"), dict):
+        # AI copilot nests each model's output under "results".
+        container = results["results"].get("forecast")
+        if not isinstance(container, dict):
+            return
+
+    rows = container.get("forecast")
+    if not isinstance(rows, list) or not rows:
+        return
+
+    parquet_url = minio_client.upload_parquet(factory_id, job_id, pd.DataFrame(rows))
+    container["forecast"] = {"parquet_url": parquet_url, "rows": len(rows)}
+
+
 @celery_app.task(name="run_analytics_job", bind=True, max_retries=1, queue="analytics")
 def run_analytics_job(self, job_id: str):
     """Celery task to run analytics job.
@@ -102,19 +115,22 @@ def run_analytics_job(self, job_id: str):
             device_count=len(job.device_ids),
         )
         
-        # Fetch telemetry data (run async function in sync context)
-        df = async_to_sync(fetch_as_dataframe)(
+        # Fetch telemetry data on the worker's persistent event loop so the
+        # Influx connection pool and frame cache survive between tasks.
+        df = run_async(fetch_as_dataframe(
             factory_id=job.factory_id,
             device_ids=job.device_ids,
             start=job.date_range_start,
             end=job.date_range_end,
-        )
+        ))
         
+        # Log the column count, not the column list: wide frames would
+        # serialize hundreds of parameter names into every job log line.
         logger.info(
             "analytics_job.data_fetched",
             job_id=job_id,
             rows=len(df),
-            columns=list(df.columns) if not df.empty else [],
+            column_count=len(df.columns),
         )
         
         # Dispatch to appropriate model
@@ -145,8 +161,10 @@ def run_analytics_job(self, job_id: str):
         
         logger.info("analytics_job.analysis_complete", job_id=job_id, result_keys=list(results.keys()))
         
-        # Upload results to MinIO
+        # Upload results to MinIO: numeric forecast rows as Parquet, the
+        # rest (metadata, anomaly lists) as JSON.
         minio_client = get_minio_client()
+        _externalize_forecast(minio_client, job.factory_id, job_id, results)
         result_url = minio_client.upload_json(
             factory_id=job.factory_id,
             job_id=job_id,
@@ -1,5 +1,6 @@
 """Celery application configuration."""
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.core.config import settings
 
@@ -20,5 +21,23 @@ celery_app.config_from_object({
     },
     "task_acks_late": True,
     "task_reject_on_worker_lost": True,
-    "worker_prefetch_multiplier": 1,  # Process one task at a time
+    # worker_prefetch_multiplier is intentionally not set globally: the
+    # long CPU-bound queues (analytics/reporting) run with
+    # --prefetch-multiplier=1, the batching rule_engine queue with 0
+    # (unlimited, so Batches can buffer), and the short I/O-bound
+    # notifications queue prefetches aggressively — see the worker
+    # commands in docker/docker-compose*.yml.
 })
+
+
+@worker_process_init.connect
+def reset_db_session(**kwargs):
+    """Drop any inherited DB session state in a freshly forked child.
+
+    Prefork children must not share the parent's scoped session (or its
+    pooled sockets); each starts clean and opens its own on first use.
+    """
+    from app.core.database import SessionLocal, sync_engine
+
+    SessionLocal.remove()
+    sync_engine.dispose(close=False)
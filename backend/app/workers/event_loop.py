@@ -0,0 +1,26 @@
+"""Persistent event loop for running async code inside Celery workers.
+
+The Influx client in this project is async-only, so sync Celery tasks have
+to bridge into a coroutine somewhere. ``async_to_sync`` spins up (and tears
+down) a fresh event loop on every call, which defeats anything that lives
+across calls on the async side: the shared Influx client's HTTP connection
+pool and the asyncio locks guarding the telemetry frame cache are all bound
+to the loop they were created on. Keeping one loop per worker process lets
+those survive between tasks.
+"""
+import asyncio
+from typing import Any, Coroutine, Optional
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine to completion on the worker's persistent event loop.
+
+    Only for use from sync Celery task code; a worker process runs one task
+    at a time, so there is no concurrent access to the loop.
+    """
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
@@ -1,18 +1,24 @@
 """Notification Celery task for alerts."""
+import functools
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.message import EmailMessage
 from datetime import datetime
 from typing import Optional
 
+import orjson
 from celery import shared_task
-from sqlalchemy import select
-from asgiref.sync import async_to_sync
+from twilio.base.exceptions import TwilioException
+from twilio.rest import Client
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
 
 from app.workers.celery_app import celery_app
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.database import AsyncSessionLocal
+from app.core.database import SessionLocal
 from app.models.user import User
 from app.models.alert import Alert
 from app.models.rule import Rule
@@ -20,164 +26,221 @@ from app.models.device import Device
 
 logger = get_logger(__name__)
 
+# Fan-out concurrency cap: keeps simultaneous SMTP sessions and Twilio
+# requests under typical provider limits.
+NOTIFY_POOL_SIZE = 10
 
-def get_alert_with_relations_sync(alert_id: int) -> dict:
-    """Get alert with rule, device, and factory info."""
-    async def _fetch():
-        async with AsyncSessionLocal() as db:
-            from sqlalchemy.orm import selectinload
-            
-            result = await db.execute(
-                select(Alert)
-                .options(selectinload(Alert.rule))
-                .options(selectinload(Alert.device))
-                .where(Alert.id == alert_id)
-            )
-            alert = result.scalar_one_or_none()
-            
-            if not alert:
-                return None
-            
-            return {
-                "id": alert.id,
-                "factory_id": alert.factory_id,
-                "rule_id": alert.rule_id,
-                "device_id": alert.device_id,
-                "triggered_at": alert.triggered_at,
-                "severity": alert.severity,
-                "message": alert.message,
-                "telemetry_snapshot": alert.telemetry_snapshot,
-                "rule_name": alert.rule.name if alert.rule else None,
-                "device_name": alert.device.name if alert.device else None,
-            }
-    
-    return async_to_sync(_fetch)()
-
-
-def get_factory_users_sync(factory_id: int) -> list:
-    """Get all active users for a factory."""
-    async def _fetch():
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(
-                select(User).where(
-                    User.factory_id == factory_id,
-                    User.is_active == True,
-                )
-            )
-            users = result.scalars().all()
-            return [
-                {
-                    "id": u.id,
-                    "email": u.email,
-                    "whatsapp_number": u.whatsapp_number,
-                }
-                for u in users
-            ]
-    
-    return async_to_sync(_fetch)()
-
-
-def mark_notification_sent_sync(alert_id: int) -> None:
-    """Mark alert as notification sent."""
-    async def _mark():
-        async with AsyncSessionLocal() as db:
-            from sqlalchemy import update
-            await db.execute(
-                update(Alert)
-                .where(Alert.id == alert_id)
-                .values(notification_sent=True)
+# Email body template, compiled once at import. The body is identical for
+# every recipient of an alert, so it is rendered once per task.
+_BODY_TMPL = string.Template("""
+FactoryOps Alert Notification
+
+Rule: $rule
+Device: $device
+Severity: $severity
+Time: $time
+
+$message
+
+Telemetry Snapshot:
+$snapshot
+
+---
+This is an automated alert from FactoryOps AI Engineering.
+""")
+
+
+def fetch_alert_and_users_sync(db, alert_id: int) -> tuple:
+    """Get the alert (with rule and device) plus its factory's active users.
+
+    Runs on the task's shared sync session. Celery task code is
+    synchronous, so the helpers use plain sessions — no per-call event
+    loop or coroutine bridge. Only plain dicts leave this function:
+    column selects skip ORM hydration entirely, and the rule/device
+    names come from outer joins instead of separate relationship loads.
+    The users query needs the alert's factory_id, so the two SELECTs run
+    sequentially.
+
+    Returns (alert_dict, users_list); (None, []) when the alert is gone.
+    """
+    alert_row = db.execute(
+        select(
+            Alert.id,
+            Alert.factory_id,
+            Alert.rule_id,
+            Alert.device_id,
+            Alert.triggered_at,
+            Alert.severity,
+            Alert.message,
+            Alert.telemetry_snapshot,
+            Rule.name.label("rule_name"),
+            Device.name.label("device_name"),
+        )
+        .outerjoin(Rule, Rule.id == Alert.rule_id)
+        .outerjoin(Device, Device.id == Alert.device_id)
+        .where(Alert.id == alert_id)
+    ).mappings().first()
+
+    if alert_row is None:
+        return None, []
+
+    users = [
+        dict(row)
+        for row in db.execute(
+            select(User.id, User.email, User.whatsapp_number).where(
+                User.factory_id == alert_row["factory_id"],
+                User.is_active == True,
             )
-            await db.commit()
-    
-    async_to_sync(_mark)()
+        ).mappings().all()
+    ]
+    return dict(alert_row), users
 
 
-def send_email(to_email: str, alert: dict) -> None:
-    """Send email notification."""
-    if not settings.smtp_host:
-        logger.debug("smtp.not_configured", email=to_email)
-        return
-    
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = settings.smtp_from
-        msg['To'] = to_email
-        msg['Subject'] = f"[{alert['severity'].upper()}] FactoryOps Alert - {alert['rule_name']}"
-        
-        body = f"""
-FactoryOps Alert Notification
+def mark_notification_sent_sync(db, alert_id: int) -> None:
+    """Mark alert as notification sent (on the task's shared session)."""
+    db.execute(
+        update(Alert)
+        .where(Alert.id == alert_id)
+        .values(notification_sent=True)
+    )
+    db.commit()
+
+
+def _render_body(alert: dict) -> str:
+    """Render the shared email body for an alert (same for all recipients)."""
+    return _BODY_TMPL.substitute(
+        rule=alert['rule_name'],
+        device=alert['device_name'] or 'Unknown',
+        severity=alert['severity'].upper(),
+        time=alert['triggered_at'],
+        message=alert['message'],
+        snapshot=orjson.dumps(
+            alert.get('telemetry_snapshot') or {}, option=orjson.OPT_INDENT_2, default=str
+        ).decode(),
+    )
+
+
+def _render_subject(alert: dict) -> str:
+    """Render the shared email subject for an alert."""
+    return f"[{alert['severity'].upper()}] FactoryOps Alert - {alert['rule_name']}"
 
+
+def _render_whatsapp_body(alert: dict) -> str:
+    """Render the shared WhatsApp body for an alert (same for all recipients)."""
+    return f"""
+FactoryOps Alert [{alert['severity'].upper()}]
 Rule: {alert['rule_name']}
 Device: {alert['device_name'] or 'Unknown'}
-Severity: {alert['severity'].upper()}
-Time: {alert['triggered_at']}
-
 {alert['message']}
+    """.strip()
 
-Telemetry Snapshot:
-{alert.get('telemetry_snapshot', {})}
 
----
-This is an automated alert from FactoryOps AI Engineering.
-        """
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        server = smtplib.SMTP(settings.smtp_host, settings.smtp_port)
-        server.starttls()
-        if settings.smtp_user and settings.smtp_password:
-            server.login(settings.smtp_user, settings.smtp_password)
-        
-        server.send_message(msg)
-        server.quit()
-        
-        logger.info("email.sent", to=to_email, alert_id=alert['id'])
-        
-    except Exception as e:
-        logger.error("email.failed", to=to_email, alert_id=alert['id'], error=str(e))
-        raise
+def _build_message(to_email: str, subject: str, body: str) -> EmailMessage:
+    """Build the alert notification email for one recipient."""
+    msg = EmailMessage()
+    msg['From'] = settings.smtp_from
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.set_content(body)
+    return msg
+
+
+def _open_smtp() -> smtplib.SMTP:
+    """Open and authenticate one SMTP session for a notification fan-out."""
+    server = smtplib.SMTP(settings.smtp_host, settings.smtp_port)
+    server.starttls()
+    if settings.smtp_user and settings.smtp_password:
+        server.login(settings.smtp_user, settings.smtp_password)
+    return server
 
 
-def send_whatsapp(to_number: str, alert: dict) -> None:
-    """Send WhatsApp notification via Twilio."""
+def _send_email_pooled(server: smtplib.SMTP, to_email: str, subject: str, body: str, alert_id: int) -> smtplib.SMTP:
+    """Send on the shared SMTP session, reconnecting once if it dropped.
+
+    Transient session failures (disconnect, 421/450) get one reconnect;
+    per-recipient rejections propagate without tearing the session down.
+    Returns the (possibly new) server so the caller keeps the session.
+    """
+    try:
+        server.send_message(_build_message(to_email, subject, body))
+    except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+        code = getattr(e, "smtp_code", None)
+        if not isinstance(e, smtplib.SMTPServerDisconnected) and code not in (421, 450):
+            raise
+        logger.warning("smtp.reconnecting", alert_id=alert_id, error=str(e))
+        server = _open_smtp()
+        server.send_message(_build_message(to_email, subject, body))
+
+    logger.info("email.sent", to=to_email, alert_id=alert_id)
+    return server
+
+
+def _send_email_job(local: threading.local, sessions: list, to_email: str, subject: str, body: str, alert_id: int) -> None:
+    """Send one email on the calling pool thread's SMTP session.
+
+    smtplib connections must not be shared across threads, so each fan-out
+    thread lazily opens its own authenticated session and keeps it for the
+    rest of the batch. Every opened session is recorded in ``sessions`` so
+    the task can close them once the pool drains.
+    """
+    server = getattr(local, "server", None)
+    if server is None:
+        server = _open_smtp()
+        sessions.append(server)
+    new_server = _send_email_pooled(server, to_email, subject, body, alert_id)
+    if new_server is not server:
+        sessions.append(new_server)
+    local.server = new_server
+
+
+@functools.lru_cache(maxsize=1)
+def _twilio_client() -> Client:
+    """Shared Twilio client; its HTTP session pools connections to the API."""
+    return Client(settings.twilio_account_sid, settings.twilio_auth_token)
+
+
+def send_whatsapp(to_number: str, body: str, alert_id: int) -> None:
+    """Send WhatsApp notification via Twilio (body prerendered per alert)."""
     if not settings.twilio_account_sid:
         logger.debug("twilio.not_configured", number=to_number)
         return
-    
+
     try:
-        from twilio.rest import Client
-        
-        client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
-        
-        message = f"""
-FactoryOps Alert [{alert['severity'].upper()}]
-Rule: {alert['rule_name']}
-Device: {alert['device_name'] or 'Unknown'}
-{alert['message']}
-        """.strip()
-        
+        client = _twilio_client()
+
         from_number = settings.twilio_whatsapp_from or f"whatsapp:{settings.twilio_whatsapp_from}"
         to_whatsapp = f"whatsapp:{to_number}"
-        
+
         message = client.messages.create(
-            body=message,
+            body=body,
             from_=from_number,
             to=to_whatsapp,
         )
-        
-        logger.info("whatsapp.sent", to=to_number, alert_id=alert['id'], sid=message.sid)
-        
+
+        logger.info("whatsapp.sent", to=to_number, alert_id=alert_id, sid=message.sid)
+
     except Exception as e:
-        logger.error("whatsapp.failed", to=to_number, alert_id=alert['id'], error=str(e))
+        logger.error("whatsapp.failed", to=to_number, alert_id=alert_id, error=str(e))
         raise
 
 
+# autoretry handles scheduling; the task body never calls self.retry, so
+# each failure produces exactly one retry. The exception tuple is narrow —
+# transient provider/DB trouble retries, plain bugs fail immediately. The
+# time limits stop a hung SMTP socket from pinning a worker thread, and
+# acks_late=False (overriding the app default) acks before execution so a
+# worker crash mid-send cannot replay the fan-out and double-notify.
 @celery_app.task(
     name="send_notifications",
     bind=True,
     max_retries=3,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
+    autoretry_for=(smtplib.SMTPException, TwilioException, OperationalError),
+    retry_backoff=2,
+    retry_backoff_max=60,
+    retry_jitter=True,
+    soft_time_limit=30,
+    time_limit=60,
+    acks_late=False,
 )
 def send_notifications_task(
     self,
@@ -189,46 +252,84 @@ def send_notifications_task(
     Skips gracefully if SMTP/Twilio not configured.
     """
     try:
-        alert = get_alert_with_relations_sync(alert_id)
-        if not alert:
-            logger.error("alert.not_found", alert_id=alert_id)
-            return
-        
-        users = get_factory_users_sync(alert["factory_id"])
-        
-        for user in users:
-            # Send email
-            if channels.get("email") and user.get("email"):
-                try:
-                    send_email(user["email"], alert)
-                except Exception as e:
-                    logger.error(
-                        "notification.email_failed",
-                        user_id=user["id"],
-                        alert_id=alert_id,
-                        error=str(e),
-                    )
-            
-            # Send WhatsApp
-            if channels.get("whatsapp") and user.get("whatsapp_number"):
+        # One session for the whole task: the fetch and the final
+        # notification_sent update share it. The commit after the reads
+        # ends that transaction and returns the connection to the pool,
+        # so nothing stays checked out while the sends run.
+        with SessionLocal() as db:
+            alert, users = fetch_alert_and_users_sync(db, alert_id)
+            db.commit()
+            if not alert:
+                logger.error("alert.not_found", alert_id=alert_id)
+                return
+
+            # Each (channel, user) send is an independent network call, so fan
+            # them out on a small thread pool: wall time drops from the sum of
+            # send latencies to roughly the slowest batch. Pool threads keep
+            # their own SMTP session (handshake/STARTTLS/LOGIN paid once per
+            # thread, reused across recipients), closed when the pool drains.
+            jobs = []
+            smtp_sessions: list = []
+            smtp_local = threading.local()
+
+            if channels.get("email"):
+                if not settings.smtp_host:
+                    logger.debug("smtp.not_configured", alert_id=alert_id)
+                else:
+                    # Subject and body depend only on the alert — render once.
+                    email_subject = _render_subject(alert)
+                    email_body = _render_body(alert)
+                    for user in users:
+                        if user.get("email"):
+                            jobs.append((
+                                "email",
+                                user,
+                                functools.partial(
+                                    _send_email_job, smtp_local, smtp_sessions,
+                                    user["email"], email_subject, email_body, alert_id,
+                                ),
+                            ))
+
+            if channels.get("whatsapp"):
+                whatsapp_body = _render_whatsapp_body(alert)
+                for user in users:
+                    if user.get("whatsapp_number"):
+                        jobs.append((
+                            "whatsapp",
+                            user,
+                            functools.partial(send_whatsapp, user["whatsapp_number"], whatsapp_body, alert_id),
+                        ))
+
+            if jobs:
                 try:
-                    send_whatsapp(user["whatsapp_number"], alert)
-                except Exception as e:
-                    logger.error(
-                        "notification.whatsapp_failed",
-                        user_id=user["id"],
-                        alert_id=alert_id,
-                        error=str(e),
-                    )
-        
-        # Mark as sent
-        mark_notification_sent_sync(alert_id)
+                    with ThreadPoolExecutor(max_workers=min(NOTIFY_POOL_SIZE, len(jobs))) as executor:
+                        futures = {executor.submit(fn): (channel, user) for channel, user, fn in jobs}
+                        for future in as_completed(futures):
+                            channel, user = futures[future]
+                            try:
+                                future.result()
+                            except Exception as e:
+                                logger.error(
+                                    f"notification.{channel}_failed",
+                                    user_id=user["id"],
+                                    alert_id=alert_id,
+                                    error=str(e),
+                                )
+                finally:
+                    for server in smtp_sessions:
+                        try:
+                            server.quit()
+                        except Exception:
+                            pass
+
+            # Mark as sent
+            mark_notification_sent_sync(db, alert_id)
         
-        logger.info(
-            "notifications.completed",
-            alert_id=alert_id,
-            user_count=len(users),
-        )
+            logger.info(
+                "notifications.completed",
+                alert_id=alert_id,
+                user_count=len(users),
+            )
         
     except Exception as exc:
         logger.error(
@@ -236,4 +337,4 @@ def send_notifications_task(
             alert_id=alert_id,
             error=str(exc),
         )
-        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+        raise
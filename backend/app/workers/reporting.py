@@ -1,19 +1,25 @@
-"""Report generators for PDF and Excel output."""
+"""Report generators for PDF, Excel, and Parquet output."""
 import json
 import io
 from datetime import datetime
+from itertools import chain
 from typing import Dict, Any, List, Optional
 
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer,
-    PageBreak, ListFlowable, ListItem
+    PageBreak, ListFlowable, ListItem, LongTable
 )
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 from app.core.logging import get_logger
@@ -21,90 +27,107 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
-def _create_table_style() -> TableStyle:
-    """Create consistent table styling."""
-    return TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e40af")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, 0), 12),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f3f4f6")),
-        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-        ("FONTSIZE", (0, 1), (-1, -1), 10),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f9fafb")]),
-    ])
+# Style objects are immutable once built, so the shared ones are created
+# at import time instead of per table / per report.
+_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e40af")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 12),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f3f4f6")),
+    ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+    ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+    ("FONTSIZE", (0, 1), (-1, -1), 10),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f9fafb")]),
+])
 
+_COVER_TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 11),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+])
+
+_STYLES = getSampleStyleSheet()
+
+_DOC_KWARGS = dict(
+    pagesize=A4,
+    rightMargin=72,
+    leftMargin=72,
+    topMargin=72,
+    bottomMargin=18,
+)
+
+_TITLE_STYLE = ParagraphStyle(
+    "CustomTitle",
+    parent=_STYLES["Heading1"],
+    fontSize=24,
+    textColor=colors.HexColor("#1e40af"),
+    spaceAfter=30,
+    alignment=1,  # Center
+)
+
+# Openpyxl style objects are safely shared across cells and workbooks.
+_HEADER_FILL = PatternFill(start_color="1e40af", end_color="1e40af", fill_type="solid")
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_ALIGNMENT = Alignment(horizontal="center")
+_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+
+# Registered once per workbook; header cells then carry a single style
+# reference instead of four attribute assignments, and the serializer
+# reuses the one named-style record.
+_HEADER_STYLE = NamedStyle(
+    name="hdr",
+    fill=_HEADER_FILL,
+    font=_HEADER_FONT,
+    border=_BORDER,
+    alignment=_HEADER_ALIGNMENT,
+)
+
+
+def _header_row(ws, titles: List[str]) -> List[WriteOnlyCell]:
+    """Build a styled header row for a write-only worksheet."""
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.style = "hdr"
+        cells.append(cell)
+    return cells
+
+
+def _cover_flowables(report_config: Dict[str, Any], data: Dict[str, Any], styles):
+    """Yield the cover page flowables."""
+    yield Paragraph("Factory Operations Report", _TITLE_STYLE)
+    yield Spacer(1, 0.3 * inch)
 
-def generate_pdf(
-    report_config: Dict[str, Any],
-    data: Dict[str, Any],
-    analytics_results: Optional[Dict[str, Any]] = None,
-) -> bytes:
-    """Generate PDF report.
-    
-    Args:
-        report_config: Report configuration (title, date range, etc.)
-        data: Aggregated report data
-        analytics_results: Optional analytics job results
-        
-    Returns:
-        PDF bytes
-    """
-    logger.info("pdf.generating", title=report_config.get("title"))
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=18,
-    )
-    
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    # Page 1: Cover
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=24,
-        textColor=colors.HexColor("#1e40af"),
-        spaceAfter=30,
-        alignment=1,  # Center
-    )
-    
-    elements.append(Paragraph("Factory Operations Report", title_style))
-    elements.append(Spacer(1, 0.3 * inch))
-    
     if report_config.get("title"):
-        elements.append(Paragraph(report_config["title"], styles["Heading2"]))
-    
+        yield Paragraph(report_config["title"], styles["Heading2"])
+
     metadata = data.get("report_metadata", {})
     cover_info = [
         ["Generated:", metadata.get("generated_at", "N/A")[:19].replace("T", " ")],
         ["Period:", f"{metadata.get('date_range_start', 'N/A')[:10]} to {metadata.get('date_range_end', 'N/A')[:10]}"],
         ["Devices:", str(len(data.get("devices", [])))],
     ]
-    
+
     cover_table = Table(cover_info, colWidths=[2 * inch, 4 * inch])
-    cover_table.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 11),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-    ]))
-    elements.append(cover_table)
-    elements.append(PageBreak())
-    
-    # Page 2: Executive Summary
-    elements.append(Paragraph("Executive Summary", styles["Heading2"]))
-    elements.append(Spacer(1, 0.2 * inch))
-    
+    cover_table.setStyle(_COVER_TABLE_STYLE)
+    yield cover_table
+    yield PageBreak()
+
+
+def _summary_flowables(data: Dict[str, Any], styles):
+    """Yield the executive summary page flowables."""
+    yield Paragraph("Executive Summary", styles["Heading2"])
+    yield Spacer(1, 0.2 * inch)
+
     alert_summary = data.get("alert_summary", {})
     summary_data = [
         ["Metric", "Value"],
@@ -115,12 +138,12 @@ def generate_pdf(
         ["Medium Alerts", str(alert_summary.get("medium", 0))],
         ["Low Alerts", str(alert_summary.get("low", 0))],
     ]
-    
+
     summary_table = Table(summary_data, colWidths=[3 * inch, 3 * inch])
-    summary_table.setStyle(_create_table_style())
-    elements.append(summary_table)
-    elements.append(Spacer(1, 0.3 * inch))
-    
+    summary_table.setStyle(_TABLE_STYLE)
+    yield summary_table
+    yield Spacer(1, 0.3 * inch)
+
     # Energy overview (if power data available)
     telemetry_summary = data.get("telemetry_summary", {})
     power_devices = []
@@ -131,33 +154,41 @@ def generate_pdf(
                 f"{params['power']['avg']} W (avg)",
                 f"{params['power']['min']} - {params['power']['max']} W",
             ])
-    
+
     if power_devices:
-        elements.append(Paragraph("Energy Overview", styles["Heading3"]))
-        elements.append(Spacer(1, 0.1 * inch))
+        yield Paragraph("Energy Overview", styles["Heading3"])
+        yield Spacer(1, 0.1 * inch)
         power_table = Table(
             [["Device", "Average Power", "Power Range"]] + power_devices,
             colWidths=[2 * inch, 2 * inch, 2 * inch],
         )
-        power_table.setStyle(_create_table_style())
-        elements.append(power_table)
-    
-    elements.append(PageBreak())
-    
-    # Page 3: Device Details
-    elements.append(Paragraph("Device Telemetry Summary", styles["Heading2"]))
-    elements.append(Spacer(1, 0.2 * inch))
-    
+        power_table.setStyle(_TABLE_STYLE)
+        yield power_table
+
+    yield PageBreak()
+
+
+def _devices_flowables(data: Dict[str, Any], styles):
+    """Yield the per-device telemetry summary flowables."""
+    yield Paragraph("Device Telemetry Summary", styles["Heading2"])
+    yield Spacer(1, 0.2 * inch)
+
+    # Strip the "device_" prefix once per summary entry rather than
+    # rebuilding the composite key string for every device lookup below.
+    stats_by_id = {}
+    for key, stats in data.get("telemetry_summary", {}).items():
+        try:
+            stats_by_id[int(key.removeprefix("device_"))] = stats
+        except ValueError:
+            continue
+
     for device in data.get("devices", []):
-        device_id = device["id"]
-        device_key = f"device_{device_id}"
-        
-        elements.append(Paragraph(
+        yield Paragraph(
             f"{device.get('name', device['device_key'])} ({device['device_key']})",
             styles["Heading3"]
-        ))
-        
-        device_stats = telemetry_summary.get(device_key, {})
+        )
+
+        device_stats = stats_by_id.get(device["id"], {})
         if device_stats:
             stats_data = [["Parameter", "Min", "Max", "Average", "Samples"]]
             for param, stats in device_stats.items():
@@ -168,120 +199,157 @@ def generate_pdf(
                     str(stats.get("avg", "N/A")),
                     str(stats.get("count", 0)),
                 ])
-            
+
             stats_table = Table(stats_data, colWidths=[1.5 * inch, 1 * inch, 1 * inch, 1 * inch, 1 * inch])
-            stats_table.setStyle(_create_table_style())
-            elements.append(stats_table)
+            stats_table.setStyle(_TABLE_STYLE)
+            yield stats_table
         else:
-            elements.append(Paragraph("No telemetry data available for this period.", styles["Normal"]))
-        
-        elements.append(Spacer(1, 0.2 * inch))
-    
-    elements.append(PageBreak())
-    
-    # Page 4: Alerts Log
-    elements.append(Paragraph("Alerts Log", styles["Heading2"]))
-    elements.append(Spacer(1, 0.2 * inch))
-    
+            yield Paragraph("No telemetry data available for this period.", styles["Normal"])
+
+        yield Spacer(1, 0.2 * inch)
+
+    yield PageBreak()
+
+
+def _alerts_flowables(data: Dict[str, Any], styles):
+    """Yield the alerts log flowables."""
+    yield Paragraph("Alerts Log", styles["Heading2"])
+    yield Spacer(1, 0.2 * inch)
+
     alerts = data.get("alerts", [])
     if alerts:
-        # Sort by triggered_at descending
-        sorted_alerts = sorted(alerts, key=lambda x: x.get("triggered_at", ""), reverse=True)
-        
+        # report_data delivers alerts already ordered by triggered_at
+        # descending (alert_repo.get_all), so no re-sort is needed here.
         alerts_data = [["Time", "Severity", "Device ID", "Message"]]
-        for alert in sorted_alerts[:100]:  # Limit to 100 alerts
+        for alert in alerts[:100]:  # Limit to 100 alerts
             alerts_data.append([
                 alert.get("triggered_at", "N/A")[:16].replace("T", " "),
                 alert.get("severity", "N/A").upper(),
                 str(alert.get("device_id", "N/A")),
                 alert.get("message", "N/A")[:60],
             ])
-        
-        alerts_table = Table(alerts_data, colWidths=[1.2 * inch, 0.9 * inch, 0.9 * inch, 3 * inch])
-        alerts_table.setStyle(_create_table_style())
-        elements.append(alerts_table)
+
+        # LongTable lays out and splits row batches incrementally instead
+        # of computing the whole table geometry up front; repeatRows keeps
+        # the header on every page.
+        alerts_table = LongTable(
+            alerts_data,
+            colWidths=[1.2 * inch, 0.9 * inch, 0.9 * inch, 3 * inch],
+            repeatRows=1,
+        )
+        alerts_table.setStyle(_TABLE_STYLE)
+        yield alerts_table
     else:
-        elements.append(Paragraph("No alerts recorded during this period.", styles["Normal"]))
-    
-    # Page 5+: Analytics Results
+        yield Paragraph("No alerts recorded during this period.", styles["Normal"])
+
+
+def _analytics_flowables(analytics_results: Dict[str, Any], styles):
+    """Yield the analytics results flowables."""
+    yield PageBreak()
+    yield Paragraph("Analytics Results", styles["Heading2"])
+    yield Spacer(1, 0.2 * inch)
+
+    # Summary text
+    if "summary" in analytics_results:
+        yield Paragraph(analytics_results["summary"], styles["Normal"])
+        yield Spacer(1, 0.2 * inch)
+
+    # Anomaly results
+    if "anomalies" in analytics_results:
+        yield Paragraph("Detected Anomalies", styles["Heading3"])
+        anomalies = analytics_results["anomalies"][:20]  # Limit to 20
+
+        if anomalies:
+            anomaly_data = [["Timestamp", "Device", "Score"]]
+            for anomaly in anomalies:
+                anomaly_data.append([
+                    anomaly.get("timestamp", "N/A")[:16].replace("T", " "),
+                    str(anomaly.get("device_id", "N/A")),
+                    f"{anomaly.get('score', 0):.3f}",
+                ])
+
+            anomaly_table = Table(anomaly_data, colWidths=[2 * inch, 1.5 * inch, 1.5 * inch])
+            anomaly_table.setStyle(_TABLE_STYLE)
+            yield anomaly_table
+        else:
+            yield Paragraph("No anomalies detected.", styles["Normal"])
+
+    # Forecast summary
+    if "forecast" in analytics_results:
+        yield Paragraph("Energy Forecast", styles["Heading3"])
+        forecast = analytics_results.get("forecast", {})
+        horizon = forecast.get("horizon_days", "N/A")
+        yield Paragraph(f"Forecast horizon: {horizon} days", styles["Normal"])
+
+
+def generate_pdf(
+    report_config: Dict[str, Any],
+    data: Dict[str, Any],
+    analytics_results: Optional[Dict[str, Any]] = None,
+) -> io.BytesIO:
+    """Generate PDF report.
+
+    Args:
+        report_config: Report configuration (title, date range, etc.)
+        data: Aggregated report data
+        analytics_results: Optional analytics job results
+
+    Returns:
+        Buffer holding the PDF, positioned at the start so the caller
+        can stream it straight to storage without copying the bytes out.
+    """
+    logger.info("pdf.generating", title=report_config.get("title"))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, **_DOC_KWARGS)
+
+    styles = _STYLES
+
+    sections = [
+        _cover_flowables(report_config, data, styles),
+        _summary_flowables(data, styles),
+        _devices_flowables(data, styles),
+        _alerts_flowables(data, styles),
+    ]
     if analytics_results and report_config.get("include_analytics"):
-        elements.append(PageBreak())
-        elements.append(Paragraph("Analytics Results", styles["Heading2"]))
-        elements.append(Spacer(1, 0.2 * inch))
-        
-        # Summary text
-        if "summary" in analytics_results:
-            elements.append(Paragraph(analytics_results["summary"], styles["Normal"]))
-            elements.append(Spacer(1, 0.2 * inch))
-        
-        # Anomaly results
-        if "anomalies" in analytics_results:
-            elements.append(Paragraph("Detected Anomalies", styles["Heading3"]))
-            anomalies = analytics_results["anomalies"][:20]  # Limit to 20
-            
-            if anomalies:
-                anomaly_data = [["Timestamp", "Device", "Score"]]
-                for anomaly in anomalies:
-                    anomaly_data.append([
-                        anomaly.get("timestamp", "N/A")[:16].replace("T", " "),
-                        str(anomaly.get("device_id", "N/A")),
-                        f"{anomaly.get('score', 0):.3f}",
-                    ])
-                
-                anomaly_table = Table(anomaly_data, colWidths=[2 * inch, 1.5 * inch, 1.5 * inch])
-                anomaly_table.setStyle(_create_table_style())
-                elements.append(anomaly_table)
-            else:
-                elements.append(Paragraph("No anomalies detected.", styles["Normal"]))
-        
-        # Forecast summary
-        if "forecast" in analytics_results:
-            elements.append(Paragraph("Energy Forecast", styles["Heading3"]))
-            forecast = analytics_results.get("forecast", {})
-            horizon = forecast.get("horizon_days", "N/A")
-            elements.append(Paragraph(f"Forecast horizon: {horizon} days", styles["Normal"]))
-    
-    # Build PDF
-    doc.build(elements)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    logger.info("pdf.generated", size_bytes=len(pdf_bytes))
-    return pdf_bytes
+        sections.append(_analytics_flowables(analytics_results, styles))
+
+    # platypus build() pops flowables off a list as it lays them out, so
+    # the chained sections are materialized once here and then consumed
+    # (and freed) incrementally during the build.
+    doc.build(list(chain(*sections)))
+    buffer.seek(0)
+
+    logger.info("pdf.generated", size_bytes=buffer.getbuffer().nbytes)
+    return buffer
 
 
 def generate_excel(
     report_config: Dict[str, Any],
     data: Dict[str, Any],
     analytics_results: Optional[Dict[str, Any]] = None,
-) -> bytes:
+) -> io.BytesIO:
     """Generate Excel report.
-    
+
     Args:
         report_config: Report configuration
         data: Aggregated report data
         analytics_results: Optional analytics job results
-        
+
     Returns:
-        Excel bytes
+        Buffer holding the workbook, positioned at the start so the
+        caller can stream it straight to storage without copying.
     """
     logger.info("excel.generating", title=report_config.get("title"))
-    
-    wb = Workbook()
-    
-    # Remove default sheet and create custom ones
-    wb.remove(wb.active)
-    
-    # Styles
-    header_fill = PatternFill(start_color="1e40af", end_color="1e40af", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-    
+
+    # Write-only mode streams each appended row out to a temp XML file
+    # instead of holding every cell object in RAM; peak memory stays flat
+    # however many alert/telemetry rows the report covers. Constraints:
+    # rows can only be appended (styles go on WriteOnlyCell instances) and
+    # column widths must be set before the first row of a sheet.
+    wb = Workbook(write_only=True)
+    wb.add_named_style(_HEADER_STYLE)
+
     # Sheet 1: Summary
     ws_summary = wb.create_sheet("Summary")
     ws_summary.append(["Factory Operations Report"])
@@ -301,17 +369,15 @@ def generate_excel(
     
     # Sheet 2: Devices
     ws_devices = wb.create_sheet("Devices")
-    ws_devices.append(["ID", "Device Key", "Name", "Manufacturer", "Model", "Region", "Last Seen"])
-    
-    # Style header
-    for cell in ws_devices[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = Alignment(horizontal="center")
-    
+    device_headers = ["ID", "Device Key", "Name", "Manufacturer", "Model", "Region", "Last Seen"]
+
+    # Track column widths while building the rows — one pass over the data
+    # instead of a second per-column walk, and no str() on values that are
+    # already strings.
+    col_widths = [len(h) for h in device_headers]
+    device_rows = []
     for device in data.get("devices", []):
-        ws_devices.append([
+        row = [
             device.get("id"),
             device.get("device_key"),
             device.get("name"),
@@ -319,33 +385,30 @@ def generate_excel(
             device.get("model"),
             device.get("region"),
             device.get("last_seen", "N/A"),
-        ])
-    
-    # Auto-adjust column widths
-    for column in ws_devices.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws_devices.column_dimensions[column_letter].width = adjusted_width
-    
+        ]
+        for i, value in enumerate(row):
+            if value is None:
+                continue
+            length = len(value) if isinstance(value, str) else len(str(value))
+            if length > col_widths[i]:
+                col_widths[i] = length
+        device_rows.append(row)
+
+    # Column widths up front: write-only sheets cannot be inspected after
+    # rows are appended.
+    for i, width in enumerate(col_widths):
+        ws_devices.column_dimensions[get_column_letter(i + 1)].width = min(width + 2, 50)
+
+    ws_devices.append(_header_row(ws_devices, device_headers))
+    for row in device_rows:
+        ws_devices.append(row)
+
     # Sheet 3: Alerts
     ws_alerts = wb.create_sheet("Alerts")
-    ws_alerts.append(["ID", "Rule ID", "Device ID", "Triggered At", "Severity", "Message"])
-    
-    # Style header
-    for cell in ws_alerts[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = Alignment(horizontal="center")
-    
-    for alert in sorted(data.get("alerts", []), key=lambda x: x.get("triggered_at", ""), reverse=True):
+    ws_alerts.append(_header_row(ws_alerts, ["ID", "Rule ID", "Device ID", "Triggered At", "Severity", "Message"]))
+
+    # Alerts arrive ordered by triggered_at descending from report_data.
+    for alert in data.get("alerts", []):
         ws_alerts.append([
             alert.get("id"),
             alert.get("rule_id"),
@@ -357,15 +420,8 @@ def generate_excel(
     
     # Sheet 4: Telemetry Summary
     ws_telemetry = wb.create_sheet("Telemetry")
-    ws_telemetry.append(["Device ID", "Parameter", "Min", "Max", "Average", "Samples"])
-    
-    # Style header
-    for cell in ws_telemetry[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = Alignment(horizontal="center")
-    
+    ws_telemetry.append(_header_row(ws_telemetry, ["Device ID", "Parameter", "Min", "Max", "Average", "Samples"]))
+
     for device_key, params in data.get("telemetry_summary", {}).items():
         device_id = device_key.replace("device_", "")
         for param, stats in params.items():
@@ -408,11 +464,67 @@ def generate_excel(
             ws_analytics.append(["Energy Forecast"])
             ws_analytics.append(["Horizon (days)", analytics_results.get("horizon_days", "N/A")])
     
-    # Save to bytes
+    # Save into a buffer for streaming upload
     buffer = io.BytesIO()
     wb.save(buffer)
-    excel_bytes = buffer.getvalue()
-    buffer.close()
-    
-    logger.info("excel.generated", size_bytes=len(excel_bytes))
-    return excel_bytes
+    buffer.seek(0)
+
+    logger.info("excel.generated", size_bytes=buffer.getbuffer().nbytes)
+    return buffer
+
+
+# Explicit schema so an empty alert list still yields a valid table.
+_ALERT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("rule_id", pa.int64()),
+    ("device_id", pa.int64()),
+    ("triggered_at", pa.string()),
+    ("severity", pa.string()),
+    ("message", pa.string()),
+])
+
+
+def generate_parquet(
+    report_config: Dict[str, Any],
+    data: Dict[str, Any],
+    analytics_results: Optional[Dict[str, Any]] = None,
+) -> io.BytesIO:
+    """Generate a Parquet data-snapshot report.
+
+    A Parquet file holds one table, so the alert rows — the only
+    section that grows with the date range — form the table body,
+    zstd-compressed and dictionary-encoded. The remaining sections
+    (devices, telemetry summary, alert summary, report metadata, and
+    analytics when included) travel as orjson blobs in the file's
+    key-value schema metadata, where pandas/pyarrow consumers can read
+    them back without a second object.
+
+    Args:
+        report_config: Report configuration
+        data: Aggregated report data
+        analytics_results: Optional analytics job results
+
+    Returns:
+        Buffer holding the Parquet file, positioned at the start so the
+        caller can stream it straight to storage without copying.
+    """
+    logger.info("parquet.generating", title=report_config.get("title"))
+
+    table = pa.Table.from_pylist(data.get("alerts") or [], schema=_ALERT_SCHEMA)
+
+    metadata = {
+        b"devices": orjson.dumps(data.get("devices") or []),
+        b"telemetry_summary": orjson.dumps(data.get("telemetry_summary") or {}),
+        b"alert_summary": orjson.dumps(data.get("alert_summary") or {}),
+        b"report_metadata": orjson.dumps(data.get("report_metadata") or {}),
+    }
+    if analytics_results and report_config.get("include_analytics"):
+        metadata[b"analytics"] = orjson.dumps(analytics_results, default=str)
+    table = table.replace_schema_metadata(metadata)
+
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd", use_dictionary=True)
+    buffer.seek(0)
+
+    logger.info("parquet.generated", size_bytes=buffer.getbuffer().nbytes)
+    return buffer
@@ -1,35 +1,61 @@
 """Reporting Celery task for generating PDF/Excel reports."""
 import asyncio
-import json
+import io
 import uuid
 from datetime import datetime
 from typing import Optional
 
-from asgiref.sync import async_to_sync
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import orjson
+import requests
+from concurrent.futures import ProcessPoolExecutor
+from boto3.s3.transfer import TransferConfig
+from requests.adapters import HTTPAdapter
+from sqlalchemy import update
 
-from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.minio_client import get_minio_client
 from app.core.logging import get_logger
 from app.workers.celery_app import celery_app
-from app.workers.reporting import generate_pdf, generate_excel
+from app.workers.event_loop import run_async
+from app.workers.reporting import generate_pdf, generate_excel, generate_parquet
 from app.services.report_data import get_report_data
 from app.models.report import Report, ReportStatus, ReportFormat
 
 logger = get_logger(__name__)
 
-# Create sync engine for Celery task
-sync_engine = create_engine(
-    settings.database_url.replace("+aiomysql", "+pymysql"),
-    pool_pre_ping=True,
+# Pooled HTTP session for fetching analytics results from MinIO:
+# connections are reused across report tasks instead of paying a fresh
+# TCP (and TLS, if terminated upstream) handshake per fetch.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+# PDF/Excel rendering is pure CPU and reportlab/openpyxl barely release
+# the GIL, so it runs in a small process pool shared by the worker
+# process. The pool is created lazily (singleton, like the MinIO and
+# Redis clients) so forked Celery children don't inherit pool state.
+_RENDER_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _render_pool() -> ProcessPoolExecutor:
+    global _RENDER_POOL
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ProcessPoolExecutor(max_workers=2)
+    return _RENDER_POOL
+
+
+# Stream report uploads in 8 MB parts so peak memory tracks the chunk
+# size rather than the report size once files cross the threshold.
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    use_threads=True,
 )
-SyncSessionLocal = sessionmaker(bind=sync_engine)
 
 
 def get_report_sync(report_id: str) -> Optional[Report]:
     """Get report by ID using sync session."""
-    with SyncSessionLocal() as session:
+    with SessionLocal() as session:
         return session.get(Report, report_id)
 
 
@@ -37,13 +63,13 @@ def get_analytics_results_sync(job_id: str) -> Optional[dict]:
     """Get analytics job results from MinIO if available."""
     try:
         from app.models.analytics_job import AnalyticsJob
-        job = SyncSessionLocal().get(AnalyticsJob, job_id)
+        with SessionLocal() as session:
+            job = session.get(AnalyticsJob, job_id)
         if job and job.status.value == "complete" and job.result_url:
-            # Fetch results from MinIO
-            import requests
-            response = requests.get(job.result_url, timeout=30)
+            # Fetch results from MinIO on the pooled session
+            response = _SESSION.get(job.result_url, timeout=30)
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
     except Exception as e:
         logger.warning("report.analytics_fetch_failed", job_id=job_id, error=str(e))
     return None
@@ -56,26 +82,28 @@ def update_report_status_sync(
     file_size: Optional[int] = None,
     error_message: Optional[str] = None,
 ) -> None:
-    """Update report status using sync session."""
-    with SyncSessionLocal() as session:
-        report = session.get(Report, report_id)
-        if not report:
+    """Update report status with a single UPDATE (no load-then-mutate SELECT)."""
+    values = {"status": status}
+
+    if file_url is not None:
+        values["file_url"] = file_url
+
+    if file_size is not None:
+        values["file_size_bytes"] = file_size
+
+    if error_message is not None:
+        values["error_message"] = error_message
+
+    with SessionLocal() as session:
+        result = session.execute(
+            update(Report).where(Report.id == report_id).values(**values)
+        )
+        session.commit()
+
+        if result.rowcount == 0:
             logger.error("report.not_found", report_id=report_id)
             return
-        
-        report.status = status
-        
-        if file_url is not None:
-            report.file_url = file_url
-        
-        if file_size is not None:
-            report.file_size_bytes = file_size
-        
-        if error_message is not None:
-            report.error_message = error_message
-        
-        session.commit()
-        
+
         logger.info(
             "report.status_updated",
             report_id=report_id,
@@ -110,9 +138,12 @@ def generate_report_task(self, report_id: str):
             device_count=len(report.device_ids),
         )
         
-        # Fetch report data (run async function in sync context with db session)
+        # Fetch report data on the worker's persistent event loop.
+        # get_report_data stays async because the Influx client it uses
+        # for telemetry summaries is async-only; run_async avoids the
+        # per-task loop bootstrap and thread hop that async_to_sync paid.
         from app.core.database import AsyncSessionLocal
-        
+
         async def fetch_data():
             async with AsyncSessionLocal() as db:
                 return await get_report_data(
@@ -122,8 +153,8 @@ def generate_report_task(self, report_id: str):
                     start=report.date_range_start,
                     end=report.date_range_end,
                 )
-        
-        data = async_to_sync(fetch_data)()
+
+        data = run_async(fetch_data())
         
         # Get analytics results if included
         analytics = None
@@ -141,48 +172,69 @@ def generate_report_task(self, report_id: str):
             "include_analytics": report.include_analytics,
         }
         
-        # Generate file based on format
+        # Generate file based on format; each branch yields a seekable
+        # buffer so the upload can stream it in parts. PDF and Excel
+        # render in the process pool: config/data are plain dicts and
+        # the BytesIO result pickles back, so the generators need no
+        # DB handles or other worker state.
         if report.format == ReportFormat.PDF:
-            file_bytes = generate_pdf(report_config, data, analytics)
+            file_buf = _render_pool().submit(
+                generate_pdf, report_config, data, analytics
+            ).result()
             content_type = "application/pdf"
             ext = "pdf"
         elif report.format == ReportFormat.EXCEL:
-            file_bytes = generate_excel(report_config, data, analytics)
+            file_buf = _render_pool().submit(
+                generate_excel, report_config, data, analytics
+            ).result()
             content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             ext = "xlsx"
+        elif report.format == ReportFormat.PARQUET:
+            file_buf = generate_parquet(report_config, data, analytics)
+            content_type = "application/vnd.apache.parquet"
+            ext = "parquet"
         else:  # JSON
             output_data = {**data, "analytics": analytics}
-            file_bytes = json.dumps(output_data, indent=2, default=str).encode("utf-8")
+            # orjson emits bytes directly and is several times faster than
+            # stdlib json on the nested report payload.
+            file_buf = io.BytesIO(
+                orjson.dumps(output_data, option=orjson.OPT_INDENT_2, default=str)
+            )
             content_type = "application/json"
             ext = "json"
-        
+
+        file_size = file_buf.getbuffer().nbytes
+
         logger.info(
             "report.generated",
             report_id=report_id,
             format=report.format.value,
-            size_bytes=len(file_bytes),
+            size_bytes=file_size,
         )
-        
-        # Upload to MinIO
+
+        # Stream to MinIO: multipart upload keeps peak memory at the
+        # chunk size instead of a second full copy of the file.
         minio_client = get_minio_client()
         key = f"{report.factory_id}/reports/{report_id}.{ext}"
-        
-        minio_client.s3_client.put_object(
+
+        minio_client.s3_client.upload_fileobj(
+            file_buf,
             Bucket=minio_client.bucket,
             Key=key,
-            Body=file_bytes,
-            ContentType=content_type,
+            ExtraArgs={"ContentType": content_type},
+            Config=_TRANSFER_CONFIG,
         )
-        
+        file_buf.close()
+
         # Generate presigned URL (24 hour expiry)
         file_url = minio_client.generate_presigned_url(key, expiry=86400)
-        
+
         # Update report as complete
         update_report_status_sync(
             report_id,
             ReportStatus.COMPLETE,
             file_url=file_url,
-            file_size=len(file_bytes),
+            file_size=file_size,
         )
         
         logger.info(
@@ -1,16 +1,23 @@
 """Rule engine condition evaluator and task."""
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import functools
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+import orjson
 from celery import shared_task
+from celery_batches import Batches
 from sqlalchemy import select, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from asgiref.sync import async_to_sync
 
 from app.workers.celery_app import celery_app
+from app.workers.event_loop import run_async
 from app.core.logging import get_logger
 from app.core.database import AsyncSessionLocal
 from app.repositories import rule_repo, alert_repo, user_repo
+from app.services import rule_cache
 from app.models.rule import Rule
 from app.models.alert import Alert, RuleCooldown
 
@@ -26,95 +33,210 @@ OPERATORS = {
     "neq": lambda a, b: a != b,
 }
 
+# Sentinel distinguishing a missing metric from an explicit None, so a
+# compiled leaf costs one dict lookup instead of a contains + getitem.
+_MISS = object()
+
+# NumPy ufunc equivalents, used to evaluate flat-AND rules across a
+# whole batch of metric snapshots in one comparison per condition.
+_VECTOR_OPS = {
+    "gt": np.greater,
+    "lt": np.less,
+    "gte": np.greater_equal,
+    "lte": np.less_equal,
+    "eq": np.equal,
+    "neq": np.not_equal,
+}
+
+
+def _compile_node(node: dict) -> Callable[[dict], bool]:
+    """Compile one condition-tree node into a closure over metrics.
+
+    Operator lookup, value casting, and tree traversal all happen here,
+    once; the returned closure does only the comparisons. Any invalid
+    node compiles to a predicate that always returns False, preserving
+    the old interpreter's never-raise contract.
+    """
+    if "conditions" in node:
+        op = str(node.get("operator", "AND")).upper()
+        subs = [_compile_node(cond) for cond in node.get("conditions", [])]
+        if not subs or op not in ("AND", "OR"):
+            return lambda metrics: False
+        combine = all if op == "AND" else any
+        return lambda metrics: combine(fn(metrics) for fn in subs)
+
+    # Leaf condition
+    param = node.get("parameter")
+    fn = OPERATORS.get(node.get("operator"))
+    try:
+        value = float(node["value"])
+    except (KeyError, TypeError, ValueError):
+        return lambda metrics: False
+    if param is None or fn is None:
+        return lambda metrics: False
+
+    def leaf(metrics: dict) -> bool:
+        val = metrics.get(param, _MISS)
+        if val is _MISS:
+            return False
+        try:
+            return fn(float(val), value)
+        except (TypeError, ValueError):
+            return False
+
+    return leaf
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_cached(payload: bytes) -> Callable[[dict], bool]:
+    """Compile a serialized condition tree, memoized on its bytes."""
+    return _compile_node(orjson.loads(payload))
+
+
+def compile_conditions(condition_tree: dict) -> Callable[[dict], bool]:
+    """Compile a condition tree into a reusable predicate over metrics.
+
+    The engine evaluates the same handful of trees on every telemetry
+    event, so the compiled closures are cached keyed on the serialized
+    (key-sorted) tree: repeated evaluation pays one call chain instead
+    of re-walking dicts and re-resolving operators per event.
+    """
+    try:
+        return _compile_cached(orjson.dumps(condition_tree, option=orjson.OPT_SORT_KEYS))
+    except Exception:
+        return lambda metrics: False
+
 
 def evaluate_conditions(condition_tree: dict, metrics: dict) -> bool:
     """
-    Recursively evaluates condition tree against metrics.
+    Evaluates condition tree against metrics.
     Returns False (not exception) on any invalid input.
     """
+    return compile_conditions(condition_tree)(metrics)
+
+
+@functools.lru_cache(maxsize=1024)
+def _flat_and_cached(payload: bytes) -> Optional[Tuple[Tuple[str, Any, float], ...]]:
+    """Parse a serialized tree into (parameter, ufunc, value) triples.
+
+    Returns None unless the tree is a flat AND of numeric leaf
+    conditions — the shape almost every factory rule takes — in which
+    case the batch evaluator can run it vectorized.
+    """
+    tree = orjson.loads(payload)
+    if str(tree.get("operator", "AND")).upper() != "AND":
+        return None
+    leaves = []
+    for cond in tree.get("conditions") or []:
+        if "conditions" in cond:
+            return None
+        param = cond.get("parameter")
+        fn = _VECTOR_OPS.get(cond.get("operator"))
+        try:
+            value = float(cond["value"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if param is None or fn is None:
+            return None
+        leaves.append((param, fn, value))
+    return tuple(leaves) or None
+
+
+def _flat_and_leaves(condition_tree: dict) -> Optional[Tuple[Tuple[str, Any, float], ...]]:
+    """Cached flat-AND parse of a condition tree; None for nested trees."""
     try:
-        op = condition_tree.get("operator", "AND").upper()
-        conditions = condition_tree.get("conditions", [])
-        
-        if not conditions:
-            return False
-        
-        results = []
-        for cond in conditions:
-            if "conditions" in cond:
-                # Nested condition tree
-                results.append(evaluate_conditions(cond, metrics))
-            else:
-                # Leaf condition
-                param = cond.get("parameter")
-                if param not in metrics:
-                    results.append(False)
-                    continue
-                
-                fn = OPERATORS.get(cond.get("operator"))
-                if not fn:
-                    results.append(False)
-                    continue
-                
-                try:
-                    result = fn(float(metrics[param]), float(cond["value"]))
-                    results.append(result)
-                except (ValueError, TypeError):
-                    results.append(False)
-        
-        if op == "AND":
-            return all(results)
-        if op == "OR":
-            return any(results)
-        return False
-        
+        return _flat_and_cached(orjson.dumps(condition_tree, option=orjson.OPT_SORT_KEYS))
     except Exception:
-        return False
+        return None
+
+
+def _metric_matrix(
+    events: List[Tuple[dict, datetime]],
+    params: set,
+) -> Dict[str, np.ndarray]:
+    """Stack the batch's metric snapshots into one array per parameter.
+
+    Missing or non-numeric values become NaN; every vectorized
+    comparison masks NaN out afterwards, so they evaluate to False just
+    like a missing parameter does in the scalar path.
+    """
+    def as_float(value: Any) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("nan")
+
+    return {
+        param: np.fromiter(
+            (as_float(metrics.get(param)) for metrics, _ in events),
+            dtype=np.float64,
+            count=len(events),
+        )
+        for param in params
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_schedule_cached(schedule_type: str, payload: bytes):
+    """Pre-parse a serialized schedule config, memoized on its bytes.
+
+    strptime walks its format string in pure Python, so parsing the
+    window on every telemetry event adds up; here each distinct config
+    is parsed once into plain time/date objects and a frozenset of
+    days. Returns None on a parse error, which callers treat as
+    "allow evaluation" like the old inline parsing did.
+    """
+    config = orjson.loads(payload)
+
+    if schedule_type == "time_window":
+        try:
+            return (
+                datetime.strptime(config["start_time"], "%H:%M").time(),
+                datetime.strptime(config["end_time"], "%H:%M").time(),
+                frozenset(config.get("days", range(1, 8))),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    if schedule_type == "date_range":
+        try:
+            return (
+                datetime.fromisoformat(config["start_date"]).date(),
+                datetime.fromisoformat(config["end_date"]).date(),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    return None
 
 
 def is_rule_scheduled(rule: Dict[str, Any], now: datetime) -> bool:
     """Check if rule should be evaluated based on schedule."""
     schedule_type = rule.get("schedule_type", "always")
-    
+
     if schedule_type == "always":
         return True
-    
+
     config = rule.get("schedule_config") or {}
-    
+
+    try:
+        parsed = _parse_schedule_cached(
+            schedule_type, orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+        )
+    except Exception:
+        return True  # On parse error, allow evaluation
+    if parsed is None:
+        return True  # On parse error, allow evaluation
+
     if schedule_type == "time_window":
-        try:
-            start_t = datetime.strptime(config["start_time"], "%H:%M").time()
-            end_t = datetime.strptime(config["end_time"], "%H:%M").time()
-            day_ok = now.isoweekday() in config.get("days", list(range(1, 8)))
-            time_ok = start_t <= now.time() <= end_t
-            return day_ok and time_ok
-        except (KeyError, ValueError):
-            return True  # On parse error, allow evaluation
-    
-    if schedule_type == "date_range":
-        try:
-            start_d = datetime.fromisoformat(config["start_date"]).date()
-            end_d = datetime.fromisoformat(config["end_date"]).date()
-            return start_d <= now.date() <= end_d
-        except (KeyError, ValueError):
-            return True  # On parse error, allow evaluation
-    
-    return True
+        start_t, end_t, days = parsed
+        return now.isoweekday() in days and start_t <= now.time() <= end_t
 
+    if schedule_type == "date_range":
+        start_d, end_d = parsed
+        return start_d <= now.date() <= end_d
 
-async def is_in_cooldown(
-    db: AsyncSession,
-    rule_id: int,
-    device_id: int,
-    cooldown_minutes: int
-) -> bool:
-    """Check if rule is in cooldown period for this device."""
-    cooldown = await alert_repo.get_cooldown(db, rule_id, device_id)
-    if not cooldown:
-        return False
-    
-    elapsed = (datetime.utcnow() - cooldown.last_triggered).total_seconds()
-    return elapsed < cooldown_minutes * 60
+    return True
 
 
 def build_alert_message(rule_name: str, conditions: dict, metrics: dict) -> str:
@@ -141,141 +263,222 @@ def build_alert_message(rule_name: str, conditions: dict, metrics: dict) -> str:
     return f"[{rule_name}] " + " AND ".join(parts)
 
 
-# Synchronous wrappers for DB operations
-def get_active_rules_for_device_sync(factory_id: int, device_id: int) -> list:
-    """Synchronous wrapper to get active rules."""
-    async def _fetch():
-        async with AsyncSessionLocal() as db:
-            return await rule_repo.get_active_for_device(db, factory_id, device_id)
-    return async_to_sync(_fetch)()
+async def _evaluate_batch(
+    factory_id: int,
+    device_id: int,
+    events: List[Tuple[dict, datetime]],
+) -> List[Tuple[int, dict]]:
+    """Evaluate buffered telemetry events for one device in one session.
 
+    All DB work for the batch is amortized: one rules lookup (usually a
+    cache hit), one SELECT for every cooldown in play, one flush for all
+    triggered alerts and one multi-row cooldown upsert — however many
+    events arrived for the device. Per-rule checks (schedule, cooldown,
+    conditions) are pure Python on data already in memory. A rule that
+    triggers on an early event enters the in-memory cooldown map, so
+    later events in the same batch respect it.
 
-def is_in_cooldown_sync(rule_id: int, device_id: int, cooldown_minutes: int) -> bool:
-    """Synchronous wrapper for cooldown check."""
-    async def _check():
-        async with AsyncSessionLocal() as db:
-            return await is_in_cooldown(db, rule_id, device_id, cooldown_minutes)
-    return async_to_sync(_check)()
+    Args:
+        events: (metrics, triggered_at) pairs, in arrival order.
 
+    Returns (alert_id, notification_channels) for each triggered rule so
+    the task body can dispatch notifications after commit.
+    """
+    now = datetime.utcnow()
 
-def create_alert_sync(
-    factory_id: int,
-    rule_id: int,
-    device_id: int,
-    triggered_at: datetime,
-    severity: str,
-    message: str,
-    snapshot: dict,
-) -> int:
-    """Synchronous wrapper to create alert."""
-    async def _create():
-        async with AsyncSessionLocal() as db:
-            alert = await alert_repo.create_alert(
-                db, factory_id, rule_id, device_id,
-                triggered_at, severity, message, snapshot
+    async with AsyncSessionLocal() as db:
+        # Rules change rarely; the cache serves them as plain dicts and
+        # skips the DB round-trip on most telemetry events.
+        rules = await rule_cache.get_active_rules(db, factory_id, device_id)
+        if not rules:
+            return []
+
+        # Bulk-load cooldowns, but only for rules that actually use one —
+        # cooldown_minutes == 0 rules never touch the cooldown table.
+        cooldown_ids = [r["id"] for r in rules if r["cooldown_minutes"] > 0]
+        last_triggered: Dict[int, datetime] = {}
+        if cooldown_ids:
+            cooldown_rows = await db.execute(
+                select(RuleCooldown.rule_id, RuleCooldown.last_triggered).where(
+                    RuleCooldown.rule_id.in_(cooldown_ids),
+                    RuleCooldown.device_id == device_id,
+                )
+            )
+            last_triggered = {rule_id: when for rule_id, when in cooldown_rows.all()}
+
+        # SoA layout for the batch: one float array per parameter that
+        # any flat-AND rule references, built once for all rules.
+        flat_leaves = {rule["id"]: _flat_and_leaves(rule["conditions"]) for rule in rules}
+        params = {
+            param
+            for leaves in flat_leaves.values() if leaves
+            for param, _, _ in leaves
+        }
+        matrix = _metric_matrix(events, params) if params and len(events) > 1 else None
+
+        triggered: List[Tuple[dict, Alert]] = []
+        for rule in rules:
+            try:
+                leaves = flat_leaves[rule["id"]]
+                if matrix is not None and leaves is not None:
+                    # Vectorized path: one ufunc call per condition over
+                    # the whole batch instead of per-event Python casts.
+                    mask = np.ones(len(events), dtype=bool)
+                    for param, fn, value in leaves:
+                        col = matrix[param]
+                        mask &= fn(col, value)
+                        mask &= ~np.isnan(col)
+                    indices = np.nonzero(mask)[0]
+                else:
+                    # Nested tree: scalar compiled predicate per event.
+                    predicate = compile_conditions(rule["conditions"])
+                    indices = [
+                        i for i, (metrics, _) in enumerate(events)
+                        if predicate(metrics)
+                    ]
+
+                # Schedule and cooldown gate the matches in event order,
+                # so the earliest match triggers and the rest cool down.
+                for i in indices:
+                    metrics, ts = events[i]
+
+                    if not is_rule_scheduled(rule, ts):
+                        continue
+
+                    if rule["cooldown_minutes"] > 0:
+                        last = last_triggered.get(rule["id"])
+                        if last and (now - last).total_seconds() < rule["cooldown_minutes"] * 60:
+                            continue
+                        last_triggered[rule["id"]] = ts
+                    triggered.append((
+                        rule,
+                        Alert(
+                            factory_id=factory_id,
+                            rule_id=rule["id"],
+                            device_id=device_id,
+                            triggered_at=ts,
+                            severity=rule["severity"],
+                            message=build_alert_message(rule["name"], rule["conditions"], metrics),
+                            telemetry_snapshot=metrics,
+                        ),
+                    ))
+
+            except Exception as e:
+                logger.error(
+                    "rule.evaluation_error",
+                    factory_id=factory_id,
+                    device_id=device_id,
+                    rule_id=rule.get("id", "unknown"),
+                    error=str(e),
+                )
+                # Continue to next rule — one failure must not affect others
+
+        if not triggered:
+            return []
+
+        # One batched INSERT for all alerts; flush populates the IDs.
+        db.add_all([alert for _, alert in triggered])
+        await db.flush()
+
+        # One multi-row upsert for all cooldowns, deduped to the latest
+        # trigger per rule (the batch may fire a rule more than once).
+        # Rules without a cooldown are skipped entirely.
+        cooldown_values: Dict[int, datetime] = {}
+        for rule, alert in triggered:
+            if rule["cooldown_minutes"] > 0:
+                cooldown_values[rule["id"]] = alert.triggered_at
+        if cooldown_values:
+            upsert = mysql_insert(RuleCooldown).values([
+                {"rule_id": rule_id, "device_id": device_id, "last_triggered": when}
+                for rule_id, when in cooldown_values.items()
+            ])
+            await db.execute(
+                upsert.on_duplicate_key_update(last_triggered=upsert.inserted.last_triggered)
             )
-            return alert.id
-    return async_to_sync(_create)()
+
+        await db.commit()
+
+        for rule, alert in triggered:
+            logger.info(
+                "alert.triggered",
+                factory_id=factory_id,
+                device_id=device_id,
+                rule_id=rule["id"],
+                alert_id=alert.id,
+            )
+
+        return [(alert.id, rule["notification_channels"]) for rule, alert in triggered]
 
 
-def upsert_cooldown_sync(rule_id: int, device_id: int, timestamp: datetime) -> None:
-    """Synchronous wrapper to upsert cooldown."""
-    async def _upsert():
-        async with AsyncSessionLocal() as db:
-            await alert_repo.upsert_cooldown(db, rule_id, device_id, timestamp)
-    async_to_sync(_upsert)()
+# Batch failures cannot use self.retry (one exception would replay every
+# buffered event), so failed groups are re-enqueued per event with this cap.
+MAX_EVAL_RETRIES = 3
 
 
 @celery_app.task(
+    base=Batches,
     name="evaluate_rules",
-    bind=True,
-    max_retries=3,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
+    flush_every=100,
+    flush_interval=1,
 )
-def evaluate_rules_task(
-    self,
-    factory_id: int,
-    device_id: int,
-    metrics: dict,
-    timestamp: str,
-):
+def evaluate_rules_task(requests):
     """
-    Evaluate all active rules for a device against current telemetry.
-    Called asynchronously after every telemetry write.
+    Evaluate buffered telemetry events against active rules.
+
+    Runs as a Batches task: the worker buffers up to ``flush_every``
+    incoming events (or ``flush_interval`` seconds, whichever first) and
+    delivers them here together. Events are grouped per device so each
+    group pays one rules/cooldown fetch for its whole backlog instead of
+    one per telemetry write.
     """
-    try:
-        rules = get_active_rules_for_device_sync(factory_id, device_id)
-        ts = datetime.fromisoformat(timestamp)
-        
-        for rule in rules:
-            try:
-                # Convert rule to dict for processing
-                rule_dict = {
-                    "id": rule.id,
-                    "name": rule.name,
-                    "conditions": rule.conditions,
-                    "cooldown_minutes": rule.cooldown_minutes,
-                    "severity": rule.severity.value if hasattr(rule.severity, 'value') else rule.severity,
-                    "schedule_type": rule.schedule_type.value if hasattr(rule.schedule_type, 'value') else rule.schedule_type,
-                    "schedule_config": rule.schedule_config,
-                    "notification_channels": rule.notification_channels,
-                }
-                
-                # Check schedule
-                if not is_rule_scheduled(rule_dict, ts):
-                    continue
-                
-                # Check cooldown
-                if is_in_cooldown_sync(rule["id"], device_id, rule["cooldown_minutes"]):
-                    continue
-                
-                # Evaluate conditions
-                if evaluate_conditions(rule["conditions"], metrics):
-                    # Trigger alert
-                    alert_id = create_alert_sync(
-                        factory_id=factory_id,
-                        rule_id=rule["id"],
-                        device_id=device_id,
-                        triggered_at=ts,
-                        severity=rule["severity"],
-                        message=build_alert_message(rule["name"], rule["conditions"], metrics),
-                        snapshot=metrics,
-                    )
-                    
-                    # Update cooldown
-                    upsert_cooldown_sync(rule["id"], device_id, ts)
-                    
-                    # Dispatch notification task
-                    from app.workers.notifications import send_notifications_task
+    by_device = defaultdict(list)
+    for request in requests:
+        key = (request.kwargs["factory_id"], request.kwargs["device_id"])
+        by_device[key].append(request)
+
+    from app.workers.notifications import send_notifications_task
+
+    for (factory_id, device_id), reqs in by_device.items():
+        try:
+            # Epoch ns off the wire; normalized to naive UTC to match the
+            # DB datetimes the evaluator compares against.
+            events = [
+                (
+                    req.kwargs["metrics"],
+                    datetime.fromtimestamp(
+                        req.kwargs["timestamp_ns"] / 1e9, tz=timezone.utc
+                    ).replace(tzinfo=None),
+                )
+                for req in reqs
+            ]
+
+            triggered = run_async(_evaluate_batch(factory_id, device_id, events))
+
+            # Dispatch notification tasks only after the alerts are
+            # committed, and only when a channel is actually enabled —
+            # no broker publish for rules that notify nobody.
+            for alert_id, channels in triggered:
+                if channels and any(channels.values()):
                     send_notifications_task.delay(
                         alert_id=alert_id,
-                        channels=rule["notification_channels"],
-                    )
-                    
-                    logger.info(
-                        "alert.triggered",
-                        factory_id=factory_id,
-                        device_id=device_id,
-                        rule_id=rule["id"],
-                        alert_id=alert_id,
+                        channels=channels,
                     )
-                    
-            except Exception as e:
-                logger.error(
-                    "rule.evaluation_error",
-                    factory_id=factory_id,
-                    device_id=device_id,
-                    rule_id=getattr(rule, 'id', 'unknown'),
-                    error=str(e),
+
+        except Exception as exc:
+            logger.error(
+                "evaluate_rules_task.failed",
+                factory_id=factory_id,
+                device_id=device_id,
+                event_count=len(reqs),
+                error=str(exc),
+            )
+            # Re-enqueue each event with backoff; a failing device group
+            # must not take down or replay the rest of the batch.
+            for req in reqs:
+                retries = req.kwargs.get("_retries", 0)
+                if retries >= MAX_EVAL_RETRIES:
+                    continue
+                evaluate_rules_task.apply_async(
+                    kwargs={**req.kwargs, "_retries": retries + 1},
+                    countdown=2 ** retries,
                 )
-                # Continue to next rule — one failure must not affect others
-                
-    except Exception as exc:
-        logger.error(
-            "evaluate_rules_task.failed",
-            factory_id=factory_id,
-            device_id=device_id,
-            error=str(exc),
-        )
-        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
@@ -27,11 +27,12 @@ async def seed_data():
             )
             session.add(factory)
             await session.flush()  # Flush to get the factory.id
-            
+
             print(f"✓ Created Factory: {factory.name} (ID: {factory.id})")
-            
-            # Create Super Admin user
-            hashed_password = bcrypt.hash("Admin@123")
+
+            # Create Super Admin user. bcrypt takes ~200ms by design;
+            # run it on a thread so the event loop isn't blocked.
+            hashed_password = await asyncio.to_thread(bcrypt.hash, "Admin@123")
             user = User(
                 factory_id=factory.id,
                 email="admin@vpc.com",
@@ -40,11 +41,10 @@ async def seed_data():
                 is_active=True
             )
             session.add(user)
-            await session.flush()
-            
-            print(f"✓ Created User: {user.email} (ID: {user.id})")
-            
-            # Create Device 1
+
+            # Create devices; with insertmanyvalues enabled on the engine
+            # these go out as one multi-row INSERT at flush time, so no
+            # per-row flushes are needed.
             device1 = Device(
                 factory_id=factory.id,
                 device_key="M01",
@@ -53,12 +53,6 @@ async def seed_data():
                 region="Zone A",
                 is_active=True
             )
-            session.add(device1)
-            await session.flush()
-            
-            print(f"✓ Created Device: {device1.name} (ID: {device1.id})")
-            
-            # Create Device 2
             device2 = Device(
                 factory_id=factory.id,
                 device_key="M02",
@@ -67,11 +61,15 @@ async def seed_data():
                 region="Zone B",
                 is_active=True
             )
-            session.add(device2)
+            session.add_all([device1, device2])
+
+            # One flush for user + devices, then commit
             await session.flush()
-            
+
+            print(f"✓ Created User: {user.email} (ID: {user.id})")
+            print(f"✓ Created Device: {device1.name} (ID: {device1.id})")
             print(f"✓ Created Device: {device2.name} (ID: {device2.id})")
-            
+
             await session.commit()
             print("\n✅ Seeding completed successfully!")
             
@@ -5,9 +5,12 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 import pytest
+import pytest_asyncio
 import asyncio
 from datetime import datetime, timedelta
 
+from httpx import AsyncClient, ASGITransport
+
 from app.core.database import AsyncSessionLocal
 from app.models.factory import Factory
 from app.models.device import Device
@@ -26,6 +29,19 @@ def event_loop():
     loop.close()
 
 
+@pytest_asyncio.fixture(scope="module")
+async def client():
+    """One shared test client for the whole module.
+
+    Building a fresh AsyncClient (and re-importing app.main) per test
+    reruns app startup each time; sharing one keeps the suite fast.
+    """
+    from app.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
 @pytest.fixture
 async def db_session():
     """Create a database session for testing."""
@@ -98,21 +114,17 @@ class TestFullFlow:
     """End-to-end tests for the full FactoryOps flow."""
     
     @pytest.mark.asyncio
-    async def test_login_and_get_token(self, test_user, test_factory):
+    async def test_login_and_get_token(self, client, test_user, test_factory):
         """Test 1: Login as super_admin and get token."""
-        from httpx import AsyncClient, ASGITransport
-        from app.main import app
-        
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/auth/login",
-                json={
-                    "factory_id": test_factory.id,
-                    "email": "admin@test.com",
-                    "password": "testpassword"
-                }
-            )
-        
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "factory_id": test_factory.id,
+                "email": "admin@test.com",
+                "password": "testpassword"
+            }
+        )
+
         assert response.status_code == 200
         data = response.json()
         assert "access_token" in data
@@ -121,23 +133,19 @@ class TestFullFlow:
         print("✓ Test 1: Login successful")
 
     @pytest.mark.asyncio
-    async def test_create_device_via_api(self, test_device, auth_headers):
+    async def test_create_device_via_api(self, client, test_device, auth_headers):
         """Test 2: Create device via API."""
-        from httpx import AsyncClient, ASGITransport
-        from app.main import app
-        
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/devices",
-                json={
-                    "device_key": "API001",
-                    "name": "API Test Device",
-                    "manufacturer": "TestCorp",
-                    "model": "TC-200"
-                },
-                headers=auth_headers
-            )
-        
+        response = await client.post(
+            "/api/v1/devices",
+            json={
+                "device_key": "API001",
+                "name": "API Test Device",
+                "manufacturer": "TestCorp",
+                "model": "TC-200"
+            },
+            headers=auth_headers
+        )
+
         assert response.status_code == 200
         data = response.json()
         assert data["device_key"] == "API001"
@@ -156,57 +164,45 @@ class TestFullFlow:
         print("✓ Test 4: Device parameters retrieved")
 
     @pytest.mark.asyncio
-    async def test_get_live_kpis(self, test_device, auth_headers):
+    async def test_get_live_kpis(self, client, test_device, auth_headers):
         """Test 7: GET /devices/{id}/kpis/live returns KPI values."""
-        from httpx import AsyncClient, ASGITransport
-        from app.main import app
-        
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get(
-                f"/api/v1/devices/{test_device.id}/kpis/live",
-                headers=auth_headers
-            )
-        
+        response = await client.get(
+            f"/api/v1/devices/{test_device.id}/kpis/live",
+            headers=auth_headers
+        )
+
         # May return 404 if no data, but should not error
         assert response.status_code in [200, 404]
         print("✓ Test 7: Live KPIs endpoint accessible")
 
     @pytest.mark.asyncio
-    async def test_get_kpi_history(self, test_device, auth_headers):
+    async def test_get_kpi_history(self, client, test_device, auth_headers):
         """Test 8: GET /devices/{id}/kpis/history returns data points."""
-        from httpx import AsyncClient, ASGITransport
-        from app.main import app
-        
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=1)
-        
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get(
-                f"/api/v1/devices/{test_device.id}/kpis/history",
-                params={
-                    "parameter": "voltage",
-                    "start": start_time.isoformat(),
-                    "end": end_time.isoformat()
-                },
-                headers=auth_headers
-            )
-        
+
+        response = await client.get(
+            f"/api/v1/devices/{test_device.id}/kpis/history",
+            params={
+                "parameter": "voltage",
+                "start": start_time.isoformat(),
+                "end": end_time.isoformat()
+            },
+            headers=auth_headers
+        )
+
         # May return 404 if no data, but should not error
         assert response.status_code in [200, 404]
         print("✓ Test 8: KPI history endpoint accessible")
 
     @pytest.mark.asyncio
-    async def test_dashboard_summary(self, test_factory, auth_headers):
+    async def test_dashboard_summary(self, client, test_factory, auth_headers):
         """Test 14: GET /dashboard/summary."""
-        from httpx import AsyncClient, ASGITransport
-        from app.main import app
-        
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get(
-                "/api/v1/dashboard/summary",
-                headers=auth_headers
-            )
-        
+        response = await client.get(
+            "/api/v1/dashboard/summary",
+            headers=auth_headers
+        )
+
         # Should return 200 even with empty data
         assert response.status_code == 200
         data = response.json()
@@ -0,0 +1,169 @@
+"""Shared fixtures and path setup for integration tests.
+
+The sys.path mutations used to live at the top of
+test_telemetry_pipeline.py, so every collection (even of unrelated
+tests) paid for them and the telemetry imports. Here they run once, and
+the telemetry handlers are imported lazily by the fixture below.
+
+Under pytest-xdist each worker gets its own MySQL database
+(``<base>_gwN``, created on the fly with the schema) and its own Redis
+logical DB, so the integration files no longer serialize on shared
+tables/keys and ``-n auto`` is safe.
+"""
+import os
+import sys
+
+import pytest
+import pytest_asyncio
+from redis.asyncio import Redis
+
+for _path in (
+    os.path.join(os.path.dirname(__file__), '..', '..'),
+    os.path.join(os.path.dirname(__file__), '..', '..', 'telemetry'),
+):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+_WORKER_NUM = int("".join(filter(str.isdigit, _WORKER or "")) or 0)
+
+# Opt-in lightweight database for repository-logic suites, e.g.
+# TEST_DB_URL=sqlite+aiosqlite:///:memory: — no disk I/O, no MySQL
+# server needed. Default stays MySQL since some cleanup SQL is
+# dialect-specific.
+_TEST_DB_URL = os.getenv("TEST_DB_URL")
+
+if _TEST_DB_URL:
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+    from sqlalchemy.pool import StaticPool
+
+    import app.core.database as database
+    from app.models.base import Base
+
+    _connect_args = (
+        {"check_same_thread": False} if _TEST_DB_URL.startswith("sqlite") else {}
+    )
+    database.engine = create_async_engine(
+        _TEST_DB_URL, poolclass=StaticPool, connect_args=_connect_args
+    )
+    database.AsyncSessionLocal = async_sessionmaker(
+        database.engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+    async def _create_schema():
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create_schema())
+
+elif _WORKER:
+    # Rebind app.core.database to a per-worker database before any test
+    # module imports AsyncSessionLocal (conftest is imported first).
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    import app.core.database as database
+    from app.models.base import Base
+
+    _base, _db_name = database.DATABASE_URL.rsplit("/", 1)
+    _worker_db = f"{_db_name}_{_WORKER}"
+    _worker_url = f"{_base}/{_worker_db}"
+    _sync_url = _worker_url.replace("+aiomysql", "+pymysql")
+
+    _admin = create_engine(_base.replace("+aiomysql", "+pymysql"))
+    with _admin.connect() as conn:
+        conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {_worker_db}"))
+    _admin.dispose()
+
+    _schema_engine = create_engine(_sync_url)
+    Base.metadata.create_all(_schema_engine)
+    _schema_engine.dispose()
+
+    database.engine = create_async_engine(_worker_url, pool_pre_ping=True)
+    database.AsyncSessionLocal = async_sessionmaker(
+        database.engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+def pytest_sessionfinish(session):
+    """Drop this worker's scratch database once its tests are done."""
+    if not _WORKER or _TEST_DB_URL:
+        return
+    from sqlalchemy import create_engine, text
+
+    admin = create_engine(_base.replace("+aiomysql", "+pymysql"))
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {_worker_db}"))
+    admin.dispose()
+
+
+class SpyWriteApi:
+    """Minimal InfluxDB write-API stand-in.
+
+    The tests only need "was write called" and the points it got;
+    recording (args, kwargs) tuples in a list skips unittest.mock's
+    call-tracking machinery entirely.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.called = False
+
+    def write(self, *args, **kwargs):
+        self.called = True
+        self.calls.append((args, kwargs))
+
+
+@pytest.fixture
+def mock_write_api():
+    """Fresh write-API spy per test (construction is two list allocs)."""
+    return SpyWriteApi()
+
+
+@pytest.fixture(scope="session")
+def process_telemetry():
+    """Lazily import the telemetry ingestion entry point."""
+    from telemetry.handlers.ingestion import process_telemetry as handler
+    return handler
+
+
+@pytest_asyncio.fixture(scope="session")
+async def redis_pool():
+    """One pooled Redis client for the whole session.
+
+    Per-test connect/close paid a TCP handshake each; the pool amortizes
+    that across the suite. Each xdist worker uses its own logical DB so
+    parallel workers cannot clobber each other's keys.
+    """
+    client = Redis.from_url(
+        f"redis://localhost:6379/{_WORKER_NUM % 16}",
+        decode_responses=True,
+        max_connections=8,
+    )
+    yield client
+    await client.close()
+
+
+@pytest_asyncio.fixture
+async def redis(redis_pool):
+    """Per-test view of the shared client, flushed on teardown."""
+    yield redis_pool
+    await redis_pool.flushdb()
@@ -3,6 +3,7 @@ import pytest
 import pytest_asyncio
 from datetime import datetime
 
+from sqlalchemy import delete, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.factory import Factory
@@ -10,178 +11,195 @@ from app.models.user import User, UserRole
 from app.models.device import Device
 from app.repositories import device_repo, parameter_repo
 from app.core.security import create_access_token, hash_password
-from app.core.database import AsyncSessionLocal
+from app.core.database import engine, AsyncSessionLocal
 
+# bcrypt is deliberately slow (~100ms); hash the fixture password once
+# at import instead of per User constructed.
+_TEST_PW_HASH = hash_password("password123")
 
-@pytest_asyncio.fixture
-async def test_factories_and_users():
-    """Create test factories and users for isolation testing."""
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_factories():
+    """Insert the two factories (with a user and device each) once per session.
+
+    Seeding and cleanup used to run per test, costing two fsync-bound
+    commits and three DELETEs each. Yields plain IDs so tests don't hold
+    detached ORM objects.
+    """
     async with AsyncSessionLocal() as db:
-        # Create Factory A
         factory_a = Factory(name="Factory A", slug="factory-a")
-        db.add(factory_a)
+        factory_b = Factory(name="Factory B", slug="factory-b")
+        db.add_all([factory_a, factory_b])
         await db.flush()
-        
-        # Create user for Factory A
+
         user_a = User(
             factory_id=factory_a.id,
             email="user@factorya.com",
-            hashed_password=hash_password("password123"),
+            hashed_password=_TEST_PW_HASH,
             role=UserRole.ADMIN,
             is_active=True,
         )
-        db.add(user_a)
-        await db.flush()
-        
-        # Create device for Factory A
-        device_a = Device(
-            factory_id=factory_a.id,
-            device_key="M01-A",
-            name="Device A",
-            is_active=True,
-        )
-        db.add(device_a)
-        
-        # Create Factory B
-        factory_b = Factory(name="Factory B", slug="factory-b")
-        db.add(factory_b)
-        await db.flush()
-        
-        # Create user for Factory B
         user_b = User(
             factory_id=factory_b.id,
             email="user@factoryb.com",
-            hashed_password=hash_password("password123"),
+            hashed_password=_TEST_PW_HASH,
             role=UserRole.ADMIN,
             is_active=True,
         )
-        db.add(user_b)
-        await db.flush()
-        
-        # Create device for Factory B
+        device_a = Device(
+            factory_id=factory_a.id,
+            device_key="M01-A",
+            name="Device A",
+            is_active=True,
+        )
         device_b = Device(
             factory_id=factory_b.id,
             device_key="M01-B",
             name="Device B",
             is_active=True,
         )
-        db.add(device_b)
+        db.add_all([user_a, user_b, device_a, device_b])
         await db.commit()
-        
-        yield {
-            "factory_a": factory_a,
-            "user_a": user_a,
-            "device_a": device_a,
-            "factory_b": factory_b,
-            "user_b": user_b,
-            "device_b": device_b,
+
+        ids = {
+            "factory_a_id": factory_a.id,
+            "user_a_id": user_a.id,
+            "device_a_id": device_a.id,
+            "factory_b_id": factory_b.id,
+            "user_b_id": user_b.id,
+            "device_b_id": device_b.id,
         }
-        
-        # Cleanup
-        await db.execute("DELETE FROM devices WHERE id IN (:a, :b)", {
-            "a": device_a.id, "b": device_b.id
-        })
-        await db.execute("DELETE FROM users WHERE id IN (:a, :b)", {
-            "a": user_a.id, "b": user_b.id
-        })
-        await db.execute("DELETE FROM factories WHERE id IN (:a, :b)", {
-            "a": factory_a.id, "b": factory_b.id
-        })
+
+        yield ids
+
+        # Cleanup once at session end: MySQL multi-table DELETE removes
+        # the devices, users and factories in a single round trip. Other
+        # dialects (e.g. the in-memory SQLite run) fall back to three
+        # Core deletes.
+        factory_ids = [ids["factory_a_id"], ids["factory_b_id"]]
+        if db.bind.dialect.name == "mysql":
+            await db.execute(
+                text(
+                    "DELETE factories, users, devices "
+                    "FROM factories "
+                    "LEFT JOIN users ON users.factory_id = factories.id "
+                    "LEFT JOIN devices ON devices.factory_id = factories.id "
+                    "WHERE factories.id IN (:a, :b)"
+                ),
+                {"a": factory_ids[0], "b": factory_ids[1]},
+            )
+        else:
+            await db.execute(delete(Device).where(Device.factory_id.in_(factory_ids)))
+            await db.execute(delete(User).where(User.factory_id.in_(factory_ids)))
+            await db.execute(delete(Factory).where(Factory.id.in_(factory_ids)))
         await db.commit()
 
 
+@pytest_asyncio.fixture
+async def db(seeded_factories):
+    """Session wrapped in an outer transaction that is always rolled back.
+
+    The session joins via a SAVEPOINT, so even tests that commit (or
+    mutate rows, like the soft-delete test) leave the seeded data
+    untouched for the next test.
+    """
+    conn = await engine.connect()
+    trans = await conn.begin()
+    session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        await session.close()
+        await trans.rollback()
+        await conn.close()
+
+
 @pytest.mark.asyncio
-async def test_list_devices_only_returns_own_factory_devices(test_factories_and_users):
+async def test_list_devices_only_returns_own_factory_devices(seeded_factories, db):
     """Test that device list only returns devices from user's factory."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # User A lists devices - should only see Factory A devices
-        devices_a, total_a = await device_repo.get_all(db, data["factory_a"].id)
-        
-        assert total_a == 1
-        assert devices_a[0].device_key == "M01-A"
-        assert devices_a[0].factory_id == data["factory_a"].id
-        
-        # Verify Factory B device is not included
-        device_ids = [d.id for d in devices_a]
-        assert data["device_b"].id not in device_ids
+    data = seeded_factories
+
+    # User A lists devices - should only see Factory A devices
+    devices_a, total_a = await device_repo.get_all(db, data["factory_a_id"])
+
+    assert total_a == 1
+    assert devices_a[0].device_key == "M01-A"
+    assert devices_a[0].factory_id == data["factory_a_id"]
+
+    # Verify Factory B device is not included
+    device_ids = [d.id for d in devices_a]
+    assert data["device_b_id"] not in device_ids
 
 
 @pytest.mark.asyncio
-async def test_get_device_from_other_factory_returns_404(test_factories_and_users):
+async def test_get_device_from_other_factory_returns_404(seeded_factories, db):
     """Test that accessing device from another factory returns 404."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # User A tries to get Factory B's device
-        device = await device_repo.get_by_id(
-            db, data["factory_a"].id, data["device_b"].id
-        )
-        
-        # Should return None (which becomes 404 in API)
-        assert device is None
+    data = seeded_factories
+
+    # User A tries to get Factory B's device
+    device = await device_repo.get_by_id(
+        db, data["factory_a_id"], data["device_b_id"]
+    )
+
+    # Should return None (which becomes 404 in API)
+    assert device is None
 
 
 @pytest.mark.asyncio
-async def test_update_device_from_other_factory_returns_404(test_factories_and_users):
+async def test_update_device_from_other_factory_returns_404(seeded_factories, db):
     """Test that updating device from another factory returns 404."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # User A tries to update Factory B's device
-        device = await device_repo.update(
-            db, data["factory_a"].id, data["device_b"].id, {"name": "Hacked"}
-        )
-        
-        # Should return None (which becomes 404 in API)
-        assert device is None
+    data = seeded_factories
+
+    # User A tries to update Factory B's device
+    device = await device_repo.update(
+        db, data["factory_a_id"], data["device_b_id"], {"name": "Hacked"}
+    )
+
+    # Should return None (which becomes 404 in API)
+    assert device is None
 
 
 @pytest.mark.asyncio
-async def test_parameter_list_from_other_factory_device_returns_404(test_factories_and_users):
+async def test_parameter_list_from_other_factory_device_returns_404(seeded_factories, db):
     """Test that listing parameters from another factory's device returns 404."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # User A tries to get parameters for Factory B's device
-        # First verify device doesn't exist in Factory A scope
-        device = await device_repo.get_by_id(
-            db, data["factory_a"].id, data["device_b"].id
-        )
-        assert device is None
+    data = seeded_factories
+
+    # User A tries to get parameters for Factory B's device
+    # First verify device doesn't exist in Factory A scope
+    device = await device_repo.get_by_id(
+        db, data["factory_a_id"], data["device_b_id"]
+    )
+    assert device is None
 
 
 @pytest.mark.asyncio
-async def test_factory_isolation_in_query_filter(test_factories_and_users):
+async def test_factory_isolation_in_query_filter(seeded_factories, db):
     """Test that factory_id filter is applied in all queries."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # Get by key should respect factory scope
-        device_in_a = await device_repo.get_by_key(
-            db, data["factory_a"].id, "M01-A"
-        )
-        assert device_in_a is not None
-        assert device_in_a.factory_id == data["factory_a"].id
-        
-        # Same key in different factory should not be found
-        device_cross = await device_repo.get_by_key(
-            db, data["factory_a"].id, "M01-B"
-        )
-        assert device_cross is None
+    data = seeded_factories
+
+    # Get by key should respect factory scope
+    device_in_a = await device_repo.get_by_key(
+        db, data["factory_a_id"], "M01-A"
+    )
+    assert device_in_a is not None
+    assert device_in_a.factory_id == data["factory_a_id"]
+
+    # Same key in different factory should not be found
+    device_cross = await device_repo.get_by_key(
+        db, data["factory_a_id"], "M01-B"
+    )
+    assert device_cross is None
 
 
 @pytest.mark.asyncio
-async def test_delete_device_from_other_factory_returns_404(test_factories_and_users):
+async def test_delete_device_from_other_factory_returns_404(seeded_factories, db):
     """Test that deleting device from another factory returns 404."""
-    data = test_factories_and_users
-    
-    async with AsyncSessionLocal() as db:
-        # User A tries to delete Factory B's device
-        device = await device_repo.soft_delete(
-            db, data["factory_a"].id, data["device_b"].id
-        )
-        
-        # Should return None (which becomes 404 in API)
-        assert device is None
+    data = seeded_factories
+
+    # User A tries to delete Factory B's device
+    device = await device_repo.soft_delete(
+        db, data["factory_a_id"], data["device_b_id"]
+    )
+
+    # Should return None (which becomes 404 in API)
+    assert device is None
@@ -3,100 +3,54 @@ import pytest
 from datetime import datetime
 
 from app.workers.rule_engine import (
+    compile_conditions,
     evaluate_conditions,
     is_rule_scheduled,
     build_alert_message,
     OPERATORS,
 )
 
+# Fixed instant (Monday 12:00) so schedule tests are deterministic and
+# skip the clock syscall.
+FROZEN_NOW = datetime(2024, 1, 15, 12, 0, 0)
+
 
 class TestConditionEvaluator:
     """Tests for evaluate_conditions function."""
     
-    # Single condition tests
-    def test_single_gt_condition_true(self):
-        """Test 'greater than' condition that evaluates to true."""
-        metrics = {"voltage": 231.5}
-        condition = {"parameter": "voltage", "operator": "gt", "value": 200}
-        tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is True
-    
-    def test_single_gt_condition_false(self):
-        """Test 'greater than' condition that evaluates to false."""
-        metrics = {"voltage": 180}
-        condition = {"parameter": "voltage", "operator": "gt", "value": 200}
-        tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is False
-    
-    def test_single_lt_condition_true(self):
-        """Test 'less than' condition that evaluates to true."""
-        metrics = {"current": 2.5}
-        condition = {"parameter": "current", "operator": "lt", "value": 5}
-        tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is True
-    
-    def test_single_lt_condition_false(self):
-        """Test 'less than' condition that evaluates to false."""
-        metrics = {"current": 10}
-        condition = {"parameter": "current", "operator": "lt", "value": 5}
+    # Single condition tests (one parametrized case per op/outcome)
+    @pytest.mark.parametrize("param,metric,op,value,expected", [
+        ("voltage", 231.5, "gt", 200, True),
+        ("voltage", 180, "gt", 200, False),
+        ("current", 2.5, "lt", 5, True),
+        ("current", 10, "lt", 5, False),
+        ("status", 1, "eq", 1, True),
+        ("mode", 0, "neq", 1, True),
+    ])
+    def test_single_condition(self, param, metric, op, value, expected):
+        """Test a single leaf condition for each operator and outcome."""
+        metrics = {param: metric}
+        condition = {"parameter": param, "operator": op, "value": value}
         tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is False
-    
-    def test_single_eq_condition_true(self):
-        """Test 'equal' condition that evaluates to true."""
-        metrics = {"status": 1}
-        condition = {"parameter": "status", "operator": "eq", "value": 1}
-        tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is True
-    
-    def test_single_neq_condition_true(self):
-        """Test 'not equal' condition that evaluates to true."""
-        metrics = {"mode": 0}
-        condition = {"parameter": "mode", "operator": "neq", "value": 1}
-        tree = {"operator": "AND", "conditions": [condition]}
-        assert evaluate_conditions(tree, metrics) is True
-    
+        assert evaluate_conditions(tree, metrics) is expected
+
     # Logical operator tests
-    def test_and_both_true_returns_true(self):
-        """Test AND with both conditions true."""
-        metrics = {"voltage": 240, "current": 5}
-        conditions = [
-            {"parameter": "voltage", "operator": "gt", "value": 200},
-            {"parameter": "current", "operator": "gt", "value": 3},
-        ]
-        tree = {"operator": "AND", "conditions": conditions}
-        assert evaluate_conditions(tree, metrics) is True
-    
-    def test_and_one_false_returns_false(self):
-        """Test AND with one false condition."""
-        metrics = {"voltage": 240, "current": 2}
-        conditions = [
-            {"parameter": "voltage", "operator": "gt", "value": 200},
-            {"parameter": "current", "operator": "gt", "value": 3},
-        ]
-        tree = {"operator": "AND", "conditions": conditions}
-        assert evaluate_conditions(tree, metrics) is False
-    
-    def test_or_one_true_returns_true(self):
-        """Test OR with one true condition."""
-        metrics = {"voltage": 180, "current": 5}
+    @pytest.mark.parametrize("logical_op,voltage,current,expected", [
+        ("AND", 240, 5, True),    # both true
+        ("AND", 240, 2, False),   # one false
+        ("OR", 180, 5, True),     # one true
+        ("OR", 180, 2, False),    # both false
+    ])
+    def test_logical_operators(self, logical_op, voltage, current, expected):
+        """Test AND/OR combination over two leaf conditions."""
+        metrics = {"voltage": voltage, "current": current}
         conditions = [
             {"parameter": "voltage", "operator": "gt", "value": 200},
             {"parameter": "current", "operator": "gt", "value": 3},
         ]
-        tree = {"operator": "OR", "conditions": conditions}
-        assert evaluate_conditions(tree, metrics) is True
-    
-    def test_or_both_false_returns_false(self):
-        """Test OR with both conditions false."""
-        metrics = {"voltage": 180, "current": 2}
-        conditions = [
-            {"parameter": "voltage", "operator": "gt", "value": 200},
-            {"parameter": "current", "operator": "gt", "value": 3},
-        ]
-        tree = {"operator": "OR", "conditions": conditions}
-        assert evaluate_conditions(tree, metrics) is False
-    
+        tree = {"operator": logical_op, "conditions": conditions}
+        assert evaluate_conditions(tree, metrics) is expected
+
     # Complex tests
     def test_nested_and_or_complex_tree(self):
         """Test nested AND/OR condition tree."""
@@ -172,14 +126,45 @@ class TestConditionEvaluator:
         assert evaluate_conditions(tree, metrics) is True
 
 
+class TestCompileConditions:
+    """Tests for compile_conditions caching behavior."""
+
+    def test_same_tree_returns_cached_predicate(self):
+        """Test that equal trees compile to the same cached callable."""
+        tree_a = {"operator": "AND", "conditions": [
+            {"parameter": "voltage", "operator": "gt", "value": 200},
+        ]}
+        tree_b = {"operator": "AND", "conditions": [
+            {"parameter": "voltage", "operator": "gt", "value": 200},
+        ]}
+        assert compile_conditions(tree_a) is compile_conditions(tree_b)
+
+    def test_compiled_predicate_is_reusable(self):
+        """Test that one compiled predicate evaluates multiple metric sets."""
+        tree = {"operator": "OR", "conditions": [
+            {"parameter": "voltage", "operator": "gt", "value": 240},
+            {"parameter": "current", "operator": "gt", "value": 10},
+        ]}
+        predicate = compile_conditions(tree)
+        assert predicate({"voltage": 245, "current": 2}) is True
+        assert predicate({"voltage": 230, "current": 12}) is True
+        assert predicate({"voltage": 230, "current": 2}) is False
+
+    def test_invalid_tree_compiles_to_false_predicate(self):
+        """Test that an uncompilable tree yields an always-False predicate."""
+        predicate = compile_conditions({"operator": "AND", "conditions": [
+            {"parameter": "voltage", "operator": "gt", "value": None},
+        ]})
+        assert predicate({"voltage": 245}) is False
+
+
 class TestScheduleValidator:
     """Tests for is_rule_scheduled function."""
     
     def test_always_schedule_returns_true(self):
         """Test 'always' schedule always returns True."""
         rule = {"schedule_type": "always"}
-        now = datetime.now()
-        assert is_rule_scheduled(rule, now) is True
+        assert is_rule_scheduled(rule, FROZEN_NOW) is True
     
     def test_time_window_within_hours_returns_true(self):
         """Test time window within range returns True."""
@@ -5,11 +5,13 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
-import json
-from typing import Optional
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
 
+import orjson
 from redis.asyncio import Redis
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
@@ -20,6 +22,24 @@ logger = get_logger(__name__)
 
 CACHE_TTL_SECONDS = 60
 
+# Process-local L1 in front of Redis. A hot device resolves without any
+# network round trip; Redis stays as the L2 so other workers and restarts
+# converge within CACHE_TTL_SECONDS either way.
+_FACTORY_CACHE: Dict[str, Tuple[float, Factory]] = {}
+_DEVICE_CACHE: Dict[Tuple[int, str], Tuple[float, Device]] = {}
+
+# Serializes only the DB-fetch path so a burst of messages for a cold
+# key does one query instead of a thundering herd.
+_db_lock = asyncio.Lock()
+
+# Built once; executed with a params dict so Core construction isn't
+# repeated per lookup.
+_FACTORY_BY_SLUG_STMT = select(Factory).where(Factory.slug == bindparam("slug"))
+_DEVICE_BY_KEY_STMT = select(Device).where(
+    Device.factory_id == bindparam("factory_id"),
+    Device.device_key == bindparam("device_key"),
+)
+
 
 def factory_to_dict(factory: Factory) -> dict:
     """Convert Factory model to dict for caching."""
@@ -71,6 +91,67 @@ def dict_to_device(data: dict) -> Device:
     return device
 
 
+async def resolve_factory_device(
+    redis: Redis,
+    db: AsyncSession,
+    slug: str,
+    device_key: str
+) -> Tuple[Optional[Factory], Optional[Device]]:
+    """
+    Resolve factory and device for a message together.
+
+    On a process-local factory hit this never touches Redis. Otherwise
+    both keys are fetched in one pipelined round trip — the device under
+    a slug-based alias key, since factory_id isn't known yet — and any
+    miss falls back to the two-step get_factory_by_slug /
+    get_or_create_device path, which repopulates the alias.
+
+    Returns (factory, device), or (None, None) for an unknown factory.
+    """
+    local = _FACTORY_CACHE.get(slug)
+    if local and time.monotonic() - local[0] < CACHE_TTL_SECONDS:
+        factory = local[1]
+        device = await get_or_create_device(redis, db, factory.id, device_key)
+        return factory, device
+
+    alias_key = f"device:slug:{slug}:{device_key}"
+    pipe = redis.pipeline(transaction=False)
+    pipe.get(f"factory:slug:{slug}")
+    pipe.get(alias_key)
+    cached_factory, cached_device = await pipe.execute()
+
+    factory = None
+    if cached_factory:
+        try:
+            factory = dict_to_factory(orjson.loads(cached_factory))
+            _FACTORY_CACHE[slug] = (time.monotonic(), factory)
+        except (orjson.JSONDecodeError, KeyError) as e:
+            logger.warning("factory.cache_decode_failed", slug=slug, error=str(e))
+            await redis.delete(f"factory:slug:{slug}")
+    if factory is None:
+        factory = await get_factory_by_slug(redis, db, slug)
+        if factory is None:
+            return None, None
+
+    if cached_device:
+        try:
+            device = dict_to_device(orjson.loads(cached_device))
+            _DEVICE_CACHE[(factory.id, device_key)] = (time.monotonic(), device)
+            return factory, device
+        except (orjson.JSONDecodeError, KeyError) as e:
+            logger.warning(
+                "device.cache_decode_failed",
+                factory_id=factory.id,
+                device_key=device_key,
+                error=str(e),
+            )
+            await redis.delete(alias_key)
+
+    device = await get_or_create_device(redis, db, factory.id, device_key)
+    await redis.setex(alias_key, CACHE_TTL_SECONDS, orjson.dumps(device_to_dict(device)))
+    return factory, device
+
+
 async def get_factory_by_slug(
     redis: Redis,
     db: AsyncSession,
@@ -87,34 +168,48 @@ async def get_factory_by_slug(
     Returns:
         Factory or None if not found
     """
+    # Try process-local cache first
+    local = _FACTORY_CACHE.get(slug)
+    if local and time.monotonic() - local[0] < CACHE_TTL_SECONDS:
+        return local[1]
+
     cache_key = f"factory:slug:{slug}"
-    
-    # Try cache first
+
+    # Try Redis next
     cached = await redis.get(cache_key)
     if cached:
         try:
-            data = json.loads(cached)
+            data = orjson.loads(cached)
             logger.debug("factory.cache_hit", slug=slug)
-            return dict_to_factory(data)
-        except (json.JSONDecodeError, KeyError) as e:
+            factory = dict_to_factory(data)
+            _FACTORY_CACHE[slug] = (time.monotonic(), factory)
+            return factory
+        except (orjson.JSONDecodeError, KeyError) as e:
             logger.warning("factory.cache_decode_failed", slug=slug, error=str(e))
             await redis.delete(cache_key)
-    
+
     # Query database
-    result = await db.execute(select(Factory).where(Factory.slug == slug))
-    factory = result.scalar_one_or_none()
-    
+    async with _db_lock:
+        # Another waiter may have resolved the same slug while we queued
+        local = _FACTORY_CACHE.get(slug)
+        if local and time.monotonic() - local[0] < CACHE_TTL_SECONDS:
+            return local[1]
+
+        result = await db.execute(_FACTORY_BY_SLUG_STMT, {"slug": slug})
+        factory = result.scalar_one_or_none()
+
     if factory:
         # Cache the result
+        _FACTORY_CACHE[slug] = (time.monotonic(), factory)
         await redis.setex(
             cache_key,
             CACHE_TTL_SECONDS,
-            json.dumps(factory_to_dict(factory))
+            orjson.dumps(factory_to_dict(factory))
         )
         logger.debug("factory.cache_set", slug=slug, factory_id=factory.id)
     else:
         logger.warning("factory.not_found", slug=slug)
-    
+
     return factory
 
 
@@ -136,52 +231,65 @@ async def get_or_create_device(
     Returns:
         Device (existing or newly created)
     """
+    # Try process-local cache first
+    local_key = (factory_id, device_key)
+    local = _DEVICE_CACHE.get(local_key)
+    if local and time.monotonic() - local[0] < CACHE_TTL_SECONDS:
+        return local[1]
+
     cache_key = f"device:{factory_id}:{device_key}"
-    
-    # Try cache first
+
+    # Try Redis next
     cached = await redis.get(cache_key)
     if cached:
         try:
-            data = json.loads(cached)
+            data = orjson.loads(cached)
             logger.debug("device.cache_hit", factory_id=factory_id, device_key=device_key)
-            return dict_to_device(data)
-        except (json.JSONDecodeError, KeyError) as e:
+            device = dict_to_device(data)
+            _DEVICE_CACHE[local_key] = (time.monotonic(), device)
+            return device
+        except (orjson.JSONDecodeError, KeyError) as e:
             logger.warning("device.cache_decode_failed", factory_id=factory_id, device_key=device_key, error=str(e))
             await redis.delete(cache_key)
-    
+
     # Query database
-    result = await db.execute(
-        select(Device).where(
-            Device.factory_id == factory_id,
-            Device.device_key == device_key
-        )
-    )
-    device = result.scalar_one_or_none()
-    
-    if not device:
-        # Auto-register new device
-        device = Device(
-            factory_id=factory_id,
-            device_key=device_key,
-            is_active=True,
-        )
-        db.add(device)
-        await db.commit()
-        await db.refresh(device)
-        
-        logger.info(
-            "device.auto_registered",
-            factory_id=factory_id,
-            device_id=device.id,
-            device_key=device_key,
+    async with _db_lock:
+        # Another waiter may have resolved the same device while we queued
+        local = _DEVICE_CACHE.get(local_key)
+        if local and time.monotonic() - local[0] < CACHE_TTL_SECONDS:
+            return local[1]
+
+        result = await db.execute(
+            _DEVICE_BY_KEY_STMT,
+            {"factory_id": factory_id, "device_key": device_key},
         )
-    
+        device = result.scalar_one_or_none()
+
+        if not device:
+            # Auto-register new device
+            device = Device(
+                factory_id=factory_id,
+                device_key=device_key,
+                is_active=True,
+            )
+            db.add(device)
+            await db.commit()
+            await db.refresh(device)
+
+            logger.info(
+                "device.auto_registered",
+                factory_id=factory_id,
+                device_id=device.id,
+                device_key=device_key,
+            )
+
     # Cache the device
+    _DEVICE_CACHE[local_key] = (time.monotonic(), device)
     await redis.setex(
         cache_key,
         CACHE_TTL_SECONDS,
-        json.dumps(device_to_dict(device))
+        orjson.dumps(device_to_dict(device))
     )
     logger.debug("device.cache_set", factory_id=factory_id, device_id=device.id, device_key=device_key)
-    
+
     return device
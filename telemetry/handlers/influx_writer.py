@@ -8,7 +8,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'
 from datetime import datetime
 from typing import List, Dict, Union
 
-from influxdb_client import Point
 from influxdb_client.client.write_api import WriteApi
 from structlog import get_logger
 
@@ -22,32 +21,36 @@ def build_points(
     device_id: int,
     metrics: Dict[str, Union[float, int]],
     timestamp: datetime
-) -> List[Point]:
+) -> List[str]:
     """
-    Build InfluxDB Point objects from metrics.
-    
+    Build InfluxDB line-protocol records from metrics.
+
+    Formats the line-protocol strings directly instead of going through
+    Point objects — same wire output, none of the per-tag allocation.
+
     Args:
         factory_id: Factory ID for tag
         device_id: Device ID for tag
         metrics: Dict of parameter_key -> numeric value
         timestamp: Datetime for the point
-    
+
     Returns:
-        List of InfluxDB Point objects
+        List of line-protocol strings
     """
     points = []
-    
+    prefix = f"device_metrics,factory_id={factory_id},device_id={device_id}"
+    ts_ns = int(timestamp.timestamp() * 1e9)
+
     for param_key, value in metrics.items():
         try:
-            point = (
-                Point("device_metrics")
-                .tag("factory_id", str(factory_id))
-                .tag("device_id", str(device_id))
-                .tag("parameter", param_key)
-                .field("value", float(value))
-                .time(timestamp)
-            )
-            points.append(point)
+            # Escape the tag value where needed; Point did this for us
+            if "," in param_key or " " in param_key or "=" in param_key:
+                param_key = (
+                    param_key.replace(",", "\\,")
+                    .replace(" ", "\\ ")
+                    .replace("=", "\\=")
+                )
+            points.append(f"{prefix},parameter={param_key} value={float(value)} {ts_ns}")
         except Exception as e:
             logger.warning(
                 "point.build_failed",
@@ -56,16 +59,17 @@ def build_points(
                 parameter=param_key,
                 error=str(e),
             )
-    
+
     return points
 
 
-async def write_batch(write_api: WriteApi, points: List[Point]) -> None:
+async def write_batch(write_api: WriteApi, points: List[str]) -> None:
     """
-    Write batch of points to InfluxDB.
-    
-    Errors are logged but NOT raised — telemetry loss is acceptable,
-    service crash is not.
+    Hand points to the batching write API.
+
+    With the batching WriteApi this is a non-blocking enqueue; the
+    client's background thread aggregates and POSTs. Errors are logged
+    but NOT raised — telemetry loss is acceptable, service crash is not.
     """
     if not points:
         return
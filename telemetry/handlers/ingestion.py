@@ -5,24 +5,66 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
-from datetime import datetime
-from typing import Dict, Any
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
+import msgspec
 from redis.asyncio import Redis
-from sqlalchemy import update
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from influxdb_client.client.write_api import WriteApi
-from pydantic import ValidationError
 from structlog import get_logger
 
-from telemetry.schemas import TelemetryPayload, parse_topic
-from telemetry.handlers.cache import get_factory_by_slug, get_or_create_device
+from telemetry.schemas import decode_payload, parse_topic
+from telemetry.handlers.cache import resolve_factory_device
 from telemetry.handlers.parameter_discovery import discover_parameters
 from telemetry.handlers.influx_writer import build_points, write_batch
-from app.models.device import Device
 
 logger = get_logger(__name__)
 
+# Device last_seen writes are coalesced here instead of an UPDATE plus
+# COMMIT per message; the subscriber drains the buffer every
+# LAST_SEEN_FLUSH_INTERVAL seconds with one batched UPDATE. Freshness is
+# bounded by the interval, which the dashboard polling cadence tolerates.
+LAST_SEEN_BUFFER: Dict[int, datetime] = {}
+LAST_SEEN_FLUSH_INTERVAL = 5  # seconds
+
+
+async def flush_last_seen() -> None:
+    """Write all buffered last_seen timestamps in a single UPDATE.
+
+    Opens its own session so it can run concurrently with message
+    processing. Failures are logged and the batch is dropped; the next
+    message per device repopulates the buffer.
+    """
+    if not LAST_SEEN_BUFFER:
+        return
+
+    pending = dict(LAST_SEEN_BUFFER)
+    LAST_SEEN_BUFFER.clear()
+
+    params = {}
+    for i, (device_id, ts) in enumerate(pending.items()):
+        params[f"id{i}"] = device_id
+        params[f"ts{i}"] = ts
+    cases = " ".join(f"WHEN :id{i} THEN :ts{i}" for i in range(len(pending)))
+    id_list = ", ".join(f":id{i}" for i in range(len(pending)))
+    query = text(
+        f"UPDATE devices SET last_seen = CASE id {cases} END "
+        f"WHERE id IN ({id_list})"
+    )
+
+    try:
+        from app.core.database import AsyncSessionLocal
+        async with AsyncSessionLocal() as session:
+            await session.execute(query, params)
+            await session.commit()
+    except Exception as e:
+        logger.warning(
+            "telemetry.last_seen_flush_failed", count=len(pending), error=str(e)
+        )
+
 
 async def process_telemetry(
     topic: str,
@@ -30,55 +72,71 @@ async def process_telemetry(
     db: AsyncSession,
     redis: Redis,
     influx_write_api: WriteApi,
+    factory_slug: Optional[str] = None,
+    device_key: Optional[str] = None,
 ) -> None:
     """
     Main telemetry processing pipeline.
-    
+
     MUST catch all exceptions — never raise.
     All steps are async and non-blocking where possible.
+
+    The subscriber passes factory_slug/device_key pre-split from the
+    topic (its SUBSCRIBE filter already guarantees the shape); other
+    callers can omit them and the topic is parsed with full validation.
     """
     try:
-        # 1. Parse topic
+        # 1. Parse topic (unless the caller already did)
+        if factory_slug is None or device_key is None:
+            try:
+                factory_slug, device_key = parse_topic(str(topic))
+            except ValueError as e:
+                logger.warning("telemetry.invalid_topic", topic=str(topic), error=str(e))
+                return
+
+        # 2. Parse and validate payload (single-pass msgspec decode)
         try:
-            factory_slug, device_key = parse_topic(str(topic))
-        except ValueError as e:
-            logger.warning("telemetry.invalid_topic", topic=str(topic), error=str(e))
+            data = decode_payload(payload)
+        except msgspec.DecodeError as e:
+            logger.warning("telemetry.invalid_payload", topic=str(topic), error=str(e))
             return
 
-        # 2. Parse and validate payload
-        try:
-            data = TelemetryPayload.model_validate_json(payload)
-        except ValidationError as e:
-            logger.warning("telemetry.invalid_payload", topic=str(topic), error=str(e))
+        if not data.metrics:
+            logger.warning("telemetry.invalid_payload", topic=str(topic), error="metrics cannot be empty")
             return
-        
-        timestamp = data.timestamp or datetime.utcnow()
 
-        # 3. Resolve factory (from cache)
-        factory = await get_factory_by_slug(redis, db, factory_slug)
+
+        # datetime.utcnow() is deprecated and returned a naive value that
+        # made .timestamp() interpret it as local time; use aware UTC.
+        timestamp = data.timestamp or datetime.now(timezone.utc)
+
+        # 3+4. Resolve factory and device together — one pipelined Redis
+        # round trip on a cold key, none on a process-local hit.
+        factory, device = await resolve_factory_device(redis, db, factory_slug, device_key)
         if not factory:
             logger.warning("telemetry.unknown_factory", slug=factory_slug, topic=str(topic))
             return
 
-        # 4. Get or create device (from cache)
-        device = await get_or_create_device(redis, db, factory.id, device_key)
-
-        # 5. Discover new parameters
-        await discover_parameters(db, factory.id, device.id, data.metrics)
-
-        # 6. Build and write InfluxDB points
+        # 5+6. Parameter discovery (MySQL) and the Influx write touch
+        # independent backends — run them concurrently so the message
+        # waits for the slower of the two, not the sum.
         points = build_points(factory.id, device.id, data.metrics, timestamp)
-        if points:
-            await write_batch(influx_write_api, points)
-
-        # 7. Update device last_seen (fire-and-forget, don't await failure)
-        try:
-            await db.execute(
-                update(Device).where(Device.id == device.id).values(last_seen=timestamp)
-            )
-            await db.commit()
-        except Exception as e:
-            logger.warning("telemetry.last_seen_update_failed", device_id=device.id, error=str(e))
+        results = await asyncio.gather(
+            discover_parameters(db, factory.id, device.id, data.metrics),
+            write_batch(influx_write_api, points),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(
+                    "telemetry.stage_failed",
+                    topic=str(topic),
+                    error=str(result),
+                    error_type=type(result).__name__,
+                )
+
+        # 7. Record last_seen; the periodic flusher batches the UPDATEs
+        LAST_SEEN_BUFFER[device.id] = timestamp
 
         # 8. Dispatch rule evaluation (non-blocking)
         try:
@@ -87,7 +145,7 @@ async def process_telemetry(
                 factory_id=factory.id,
                 device_id=device.id,
                 metrics=data.metrics,
-                timestamp=timestamp.isoformat(),
+                timestamp_ns=int(timestamp.timestamp() * 1e9),
             )
         except Exception as e:
             logger.warning("telemetry.rule_dispatch_failed", factory_id=factory.id, error=str(e))
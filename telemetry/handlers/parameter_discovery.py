@@ -1,5 +1,6 @@
 """Parameter discovery handler for telemetry ingestion."""
-from typing import Dict, Union
+from functools import lru_cache
+from typing import Dict, Set, Tuple, Union
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +8,34 @@ from structlog import get_logger
 
 logger = get_logger(__name__)
 
+# Keys this process has already upserted. The parameter set of a device
+# is ~stable, so in steady state every key is here and the DB write is
+# skipped entirely; worst case after a restart is one redundant upsert
+# per known key (idempotent). Also stands in for per-key rowcount when
+# deciding what to log as newly discovered.
+_seen: Set[Tuple[int, int, str]] = set()
+
+# parameter_key -> (display_name, data_type), stable per string; the
+# same key recurs across devices, so compute its metadata once from the
+# first observation.
+_META_CACHE: Dict[str, Tuple[str, str]] = {}
+
+
+@lru_cache(maxsize=32)
+def _upsert_stmt(row_count: int):
+    """Multi-row upsert TextClause for ``row_count`` rows, built once per
+    distinct batch size instead of per call."""
+    rows = ", ".join(
+        f"(:factory_id, :device_id, :k{i}, :n{i}, :t{i}, TRUE, NOW(), NOW())"
+        for i in range(row_count)
+    )
+    return text(
+        "INSERT INTO device_parameters "
+        "(factory_id, device_id, parameter_key, display_name, data_type, is_kpi_selected, discovered_at, updated_at) "
+        f"VALUES {rows} "
+        "ON DUPLICATE KEY UPDATE updated_at = NOW()"
+    )
+
 
 async def discover_parameters(
     db: AsyncSession,
@@ -15,50 +44,58 @@ async def discover_parameters(
     metrics: Dict[str, Union[float, int]]
 ) -> Dict[str, bool]:
     """
-    Upserts all metric keys into device_parameters.
-    
+    Upserts unseen metric keys into device_parameters.
+
+    Keys this process already knows are skipped without touching the
+    database; the rest go in one multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE, so a message costs at most one
+    round trip and usually none.
+
     Returns dict of {parameter_key: is_newly_discovered}
     Must be idempotent — safe to call on every message.
     """
-    newly_discovered = {}
-    
-    for key, value in metrics.items():
-        # Determine data type
-        data_type = "float" if isinstance(value, float) else "int"
-        
-        # Build display name from key (e.g., "voltage_l1" -> "Voltage L1")
-        display_name = key.replace("_", " ").title()
-        
-        # INSERT ... ON DUPLICATE KEY UPDATE (idempotent upsert)
-        query = text("""
-            INSERT INTO device_parameters 
-                (factory_id, device_id, parameter_key, display_name, data_type, is_kpi_selected, discovered_at, updated_at)
-            VALUES 
-                (:factory_id, :device_id, :key, :display_name, :data_type, TRUE, NOW(), NOW())
-            ON DUPLICATE KEY UPDATE 
-                updated_at = NOW()
-        """)
-        
-        result = await db.execute(query, {
-            "factory_id": factory_id,
-            "device_id": device_id,
-            "key": key,
-            "display_name": display_name,
-            "data_type": data_type,
-        })
-        
-        # rowcount: 1 = insert, 2 = update (MySQL behavior)
-        is_newly_discovered = result.rowcount == 1
-        newly_discovered[key] = is_newly_discovered
-        
-        if is_newly_discovered:
+    if not metrics:
+        return {}
+
+    unknown = [
+        key for key in metrics if (factory_id, device_id, key) not in _seen
+    ]
+    if not unknown:
+        return {key: False for key in metrics}
+
+    unknown_set = set(unknown)
+    newly_discovered = {key: key in unknown_set for key in metrics}
+    data_types = {}
+    params = {"factory_id": factory_id, "device_id": device_id}
+
+    for i, key in enumerate(unknown):
+        meta = _META_CACHE.get(key)
+        if meta is None:
+            # Display name from key (e.g., "voltage_l1" -> "Voltage L1")
+            # and data type from the first observed value.
+            meta = (
+                key.replace("_", " ").title(),
+                "float" if isinstance(metrics[key], float) else "int",
+            )
+            _META_CACHE[key] = meta
+        data_types[key] = meta[1]
+
+        params[f"k{i}"] = key
+        params[f"n{i}"] = meta[0]
+        params[f"t{i}"] = meta[1]
+
+    await db.execute(_upsert_stmt(len(unknown)), params)
+    await db.commit()
+
+    for key, is_new in newly_discovered.items():
+        if is_new:
+            _seen.add((factory_id, device_id, key))
             logger.info(
                 "parameter.discovered",
                 factory_id=factory_id,
                 device_id=device_id,
                 parameter=key,
-                data_type=data_type,
+                data_type=data_types[key],
             )
-    
-    await db.commit()
+
     return newly_discovered
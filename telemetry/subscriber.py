@@ -5,8 +5,8 @@ from typing import AsyncGenerator
 
 import aiomqtt
 from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
-from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import WriteOptions
 from structlog import get_logger
 
 import sys
@@ -16,21 +16,23 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
 from app.core.logging import configure_logging, get_logger as app_get_logger
-from telemetry.handlers.ingestion import process_telemetry
+from telemetry.handlers.ingestion import (
+    LAST_SEEN_FLUSH_INTERVAL,
+    flush_last_seen,
+    process_telemetry,
+)
 
 # Configure logging
 configure_logging()
 logger = app_get_logger(__name__)
 
 
-@asynccontextmanager
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Async context manager for database sessions."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# Cap on concurrently processing messages. Each in-flight message runs
+# on its own session so SQLAlchemy's connection pool can serve them in
+# parallel instead of serializing everything through one connection.
+MAX_IN_FLIGHT = 64
+_in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+_tasks: set = set()
 
 
 @asynccontextmanager
@@ -45,23 +47,80 @@ async def redis_client() -> AsyncGenerator[Redis, None]:
 
 @asynccontextmanager
 async def influx_write_api() -> AsyncGenerator:
-    """Async context manager for InfluxDB write API."""
-    client = InfluxDBClientAsync(
+    """Async context manager for the batching InfluxDB write API.
+
+    The batching WriteApi enqueues records to a background thread that
+    coalesces them into one HTTP POST per batch_size/flush_interval, so
+    write() is a non-blocking enqueue and safe to call from the event
+    loop — one HTTP round trip per batch instead of per message.
+    """
+    client = InfluxDBClient(
         url=settings.influxdb_url,
         token=settings.influxdb_token,
         org=settings.influxdb_org,
     )
+    write_api = client.write_api(
+        write_options=WriteOptions(
+            batch_size=5_000,
+            flush_interval=1_000,
+            jitter_interval=200,
+        )
+    )
     try:
-        write_api = client.write_api()
         yield write_api
     finally:
-        await client.close()
+        write_api.close()  # flushes anything still buffered
+        client.close()
+
+
+async def _handle_message(
+    topic_str: str,
+    payload: bytes,
+    redis: Redis,
+    write_api,
+    factory_slug: str,
+    device_key: str,
+) -> None:
+    """Process one message on a fresh session, then release its slot."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await process_telemetry(
+                topic=topic_str,
+                payload=payload,
+                db=db,
+                redis=redis,
+                influx_write_api=write_api,
+                factory_slug=factory_slug,
+                device_key=device_key,
+            )
+    finally:
+        _in_flight.release()
+
+
+def _fast_parse(topic_str: str):
+    """Split the two wildcard segments out of a telemetry topic.
+
+    The broker only delivers topics matching the subscribed filter
+    factories/+/devices/+/telemetry, so the literal segments are
+    invariant and re-validating them per message is wasted work. The
+    fully checked parse_topic in schemas.py remains for other callers.
+    """
+    parts = topic_str.split("/", 4)
+    return parts[1], parts[3]
+
+
+async def _last_seen_flush_loop():
+    """Periodically drain the coalesced last_seen buffer."""
+    while True:
+        await asyncio.sleep(LAST_SEEN_FLUSH_INTERVAL)
+        await flush_last_seen()
 
 
 async def start():
     """Start the MQTT subscriber with reconnection logic."""
     retry_delay = 1
-    
+    asyncio.create_task(_last_seen_flush_loop())
+
     while True:
         try:
             async with aiomqtt.Client(
@@ -83,16 +142,26 @@ async def start():
                     topic="factories/+/devices/+/telemetry",
                 )
 
-                async with db_session() as db, redis_client() as redis:
+                async with redis_client() as redis:
                     async with influx_write_api() as write_api:
                         async for message in client.messages:
-                            await process_telemetry(
-                                topic=message.topic,
-                                payload=message.payload,
-                                db=db,
-                                redis=redis,
-                                influx_write_api=write_api,
+                            topic_str = str(message.topic)
+                            factory_slug, device_key = _fast_parse(topic_str)
+                            # Acquire before spawning so the loop stops
+                            # reading once MAX_IN_FLIGHT are processing.
+                            await _in_flight.acquire()
+                            task = asyncio.create_task(
+                                _handle_message(
+                                    topic_str,
+                                    message.payload,
+                                    redis,
+                                    write_api,
+                                    factory_slug,
+                                    device_key,
+                                )
                             )
+                            _tasks.add(task)
+                            task.add_done_callback(_tasks.discard)
 
         except aiomqtt.MqttError as e:
             logger.error(